@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Benchmark each parsing phase against the bundled committee PDFs.
+
+Every phase (extract_spans, assemble_lines, parse_amendments,
+amendments_to_json) is timed separately, plus the end-to-end parse, over a
+number of repeats after a warm-up run.  Results are written as JSON so runs
+from different commits can be compared:
+
+    python benchmark.py -o before.json
+    python benchmark.py -o after.json --compare before.json
+"""
+
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import parse_amendments as pa
+
+ROOT = Path(__file__).parent
+FIXTURES = sorted((ROOT / "tests").glob("*-AM-*.pdf"))
+PHASES = ("extract_spans", "assemble_lines", "parse_amendments", "amendments_to_json", "end_to_end")
+
+
+def _time(fn, repeats: int, warmup: int) -> tuple:
+    """Run ``fn`` ``warmup + repeats`` times; return (last result, timed durations)."""
+    for _ in range(warmup):
+        result = fn()
+    durations = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        result = fn()
+        durations.append(time.perf_counter() - started)
+    return result, durations
+
+
+def _stats(durations: list) -> dict:
+    return {
+        "min_s": min(durations),
+        "median_s": statistics.median(durations),
+        "mean_s": statistics.mean(durations),
+        "stdev_s": statistics.stdev(durations) if len(durations) > 1 else 0.0,
+        "runs": len(durations),
+    }
+
+
+def bench_document(pdf: Path, repeats: int = 5, warmup: int = 1) -> dict:
+    """Time every phase of one document in isolation, then end to end."""
+    source = str(pdf)
+    spans, t_extract = _time(lambda: pa.extract_spans(source), repeats, warmup)
+    lines, t_lines = _time(lambda: pa.assemble_lines(spans), repeats, warmup)
+    amendments, t_parse = _time(lambda: pa.parse_amendments(lines), repeats, warmup)
+    _, t_json = _time(lambda: pa.amendments_to_json(amendments), repeats, warmup)
+    _, t_total = _time(lambda: pa.amendments_to_json(pa.parse_pdf(source)), repeats, warmup)
+    return {
+        "counts": {
+            "pages": pa.pdf_page_count(source),
+            "spans": len(spans),
+            "lines": len(lines),
+            "amendments": len(amendments),
+        },
+        "phases": {
+            "extract_spans": _stats(t_extract),
+            "assemble_lines": _stats(t_lines),
+            "parse_amendments": _stats(t_parse),
+            "amendments_to_json": _stats(t_json),
+            "end_to_end": _stats(t_total),
+        },
+    }
+
+
+def _git_commit() -> str:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                             capture_output=True, text=True, check=True)
+        return out.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def run_benchmarks(pdfs: list, repeats: int = 5, warmup: int = 1) -> dict:
+    return {
+        "environment": {
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "pymupdf": pa.fitz.VersionBind,
+            "platform": platform.platform(),
+        },
+        "repeats": repeats,
+        "warmup": warmup,
+        "documents": {pdf.name: bench_document(pdf, repeats, warmup) for pdf in pdfs},
+    }
+
+
+def compare(baseline: dict, current: dict) -> list:
+    """Rows of (document, phase, baseline median, current median, relative change)."""
+    rows = []
+    for name, doc in current["documents"].items():
+        base_doc = baseline.get("documents", {}).get(name)
+        if base_doc is None:
+            continue
+        for phase in PHASES:
+            old = base_doc["phases"].get(phase, {}).get("median_s")
+            new = doc["phases"][phase]["median_s"]
+            if old:
+                rows.append((name, phase, old, new, new / old - 1))
+    return rows
+
+
+def _print_report(results: dict, baseline: dict = None) -> None:
+    for name, doc in results["documents"].items():
+        c = doc["counts"]
+        print(f"{name}  ({c['pages']} pages, {c['spans']} spans, {c['lines']} lines, "
+              f"{c['amendments']} amendments)")
+        for phase in PHASES:
+            s = doc["phases"][phase]
+            print(f"  {phase:<20} median {s['median_s'] * 1000:8.2f} ms  "
+                  f"min {s['min_s'] * 1000:8.2f} ms  ±{s['stdev_s'] * 1000:.2f}")
+    if baseline:
+        print("\nChange in median vs baseline:")
+        for name, phase, old, new, change in compare(baseline, results):
+            print(f"  {name:<26} {phase:<20} {old * 1000:8.2f} → {new * 1000:8.2f} ms  {change:+.1%}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the EP amendments parser")
+    parser.add_argument("pdfs", nargs="*", type=Path, help="PDFs to benchmark (default: bundled fixtures)")
+    parser.add_argument("-n", "--repeats", type=int, default=5, help="Timed runs per phase (default: 5)")
+    parser.add_argument("--warmup", type=int, default=1, help="Untimed runs per phase (default: 1)")
+    parser.add_argument("-o", "--output", default="bench_results.json", help="Results JSON file")
+    parser.add_argument("--compare", metavar="FILE", help="Earlier results file to compare against")
+    args = parser.parse_args()
+
+    results = run_benchmarks(args.pdfs or FIXTURES, repeats=args.repeats, warmup=args.warmup)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+    _print_report(results, baseline)
+    print(f"\nResults written to {args.output}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
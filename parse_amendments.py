@@ -5,11 +5,33 @@ Parse European Parliament committee amendments PDF into structured JSON records.
 
 import re
 import json
+import os
 import sys
+import mmap
+import struct
+import shutil
+import glob
+import time
+import hashlib
+import socket
 import argparse
-from dataclasses import dataclass, field
-from typing import Optional
-import fitz  # PyMuPDF
+import threading
+import multiprocessing
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, as_completed, wait
+from contextlib import contextmanager
+from collections import Counter
+from dataclasses import asdict, dataclass, field, replace
+from itertools import groupby
+from typing import Iterable, Iterator, NamedTuple, Optional, Union
+try:
+    import pymupdf as fitz  # PyMuPDF ≥ 1.24.3; the "fitz" alias prints a deprecation notice to stdout
+except ImportError:
+    import fitz  # PyMuPDF
+
+try:
+    import numpy as np
+except ImportError:  # numpy is only needed for the opt-in columnar store
+    np = None
 
 
 # ── constants ────────────────────────────────────────────────────────────────
@@ -20,11 +42,18 @@ COLUMN_SPLIT_X = 244           # left < this → original; right ≥ this → am
 AMBIGUOUS_LOW = 220            # warn if span x falls in [220, 300]
 AMBIGUOUS_HIGH = 300
 LINE_Y_TOLERANCE = 2           # pts; spans within this are on the same line
+HEADER_MIN_SIZE = 11           # bold lines at least this size are headers, authors or sections
 AMENDMENT_HEADER_X_TOLERANCE = 80  # "Amendment N" text can be at x≈71 or x≈139
 
 AMENDMENT_RE = re.compile(r'^Amendment\s+(\d+)$', re.IGNORECASE)
 LANGUAGE_MARKER_RE = re.compile(r'^Or\.\s+[a-z]{2}$', re.IGNORECASE)
 DOC_CODE_RE = re.compile(r'PE\s*\d{3}[\.,]\d{3}|AM\\\d+|[A-Z]+-AM-\d', re.IGNORECASE)
+# Bold lines containing one of these are section labels; other bold lines in
+# the header block are author names.
+SECTION_KEYWORDS = (
+    "Motion for a resolution", "Paragraph", "Recital",
+    "Article", "Heading", "Title", "Annex", "Proposal",
+)
 # Column header labels that appear alone in the right column and should not be
 # treated as amendment content (they are the right-column heading row).
 TABLE_COLUMN_LABEL_RE = re.compile(
@@ -33,6 +62,90 @@ TABLE_COLUMN_LABEL_RE = re.compile(
 )
 
 
+# A PDF can be given as a filesystem path or as the raw bytes of the file.
+PdfSource = Union[str, os.PathLike, bytes]
+
+
+# ── layout profiles ───────────────────────────────────────────────────────────
+
+@dataclass(frozen=True)
+class LayoutProfile:
+    """Page geometry of one family of documents, in points from the top left.
+
+    Margins and the footer band become the clip rectangle handed to PyMuPDF,
+    so text outside it is never extracted.
+    """
+    name: str
+    margin_left: float = 0
+    margin_top: float = 0
+    margin_right: float = 0
+    footer_y: float = FOOTER_Y_THRESHOLD          # baselines below this are footer text
+    watermark_size: float = LARGE_FONT_THRESHOLD  # spans this large or larger are watermarks
+    column_split: float = COLUMN_SPLIT_X
+    ambiguous_low: float = AMBIGUOUS_LOW
+    ambiguous_high: float = AMBIGUOUS_HIGH
+    left_column_x: float = 70.8                   # where left/right column text starts;
+    right_column_x: float = 314.7                 # the reference for calibration
+
+    def clip(self, page_rect) -> "fitz.Rect":
+        return fitz.Rect(self.margin_left, self.margin_top,
+                         page_rect.x1 - self.margin_right, min(self.footer_y, page_rect.y1))
+
+    def cache_params(self) -> str:
+        """Everything that changes extracted spans, for the span cache key."""
+        return (f"clip={self.margin_left},{self.margin_top},{self.margin_right},{self.footer_y};"
+                f"large_font={self.watermark_size}")
+
+
+LAYOUTS = {
+    "ep": LayoutProfile("ep"),
+}
+DEFAULT_LAYOUT = LAYOUTS["ep"]
+
+
+def load_layout(spec: str) -> LayoutProfile:
+    """A profile from :data:`LAYOUTS` by name, or from a JSON file of its fields."""
+    if spec in LAYOUTS:
+        return LAYOUTS[spec]
+    if not spec.endswith(".json"):
+        raise ValueError(f"unknown layout {spec!r}; choose from {', '.join(LAYOUTS)} or give a .json file")
+    with open(spec, encoding="utf-8") as f:
+        fields = json.load(f)
+    fields.setdefault("name", os.path.splitext(os.path.basename(spec))[0])
+    return LayoutProfile(**fields)
+
+
+# ── parser configuration ──────────────────────────────────────────────────────
+
+@dataclass(frozen=True)
+class ParserConfig:
+    """Every tunable the pipeline reads, as one immutable value.
+
+    Each phase takes a ``config`` instead of reading the module constants
+    (which only supply the defaults), so documents with different layouts can
+    be parsed side by side in one process.  Derive variants with
+    ``dataclasses.replace``.
+    """
+    layout: LayoutProfile = DEFAULT_LAYOUT
+    line_y_tolerance: float = LINE_Y_TOLERANCE
+    header_min_size: float = HEADER_MIN_SIZE
+    section_keywords: tuple = SECTION_KEYWORDS
+    page_layouts: tuple = ()  # (page_num, LayoutProfile) overrides, sorted by page; a dict is converted
+
+    def __post_init__(self):
+        pairs = self.page_layouts.items() if isinstance(self.page_layouts, dict) else self.page_layouts
+        object.__setattr__(self, "page_layouts", tuple(sorted(pairs, key=lambda pair: pair[0])))
+
+    def layout_for(self, page_num: int) -> LayoutProfile:
+        for override_page, layout in self.page_layouts:  # usually empty, at most a few odd pages
+            if override_page == page_num:
+                return layout
+        return self.layout
+
+
+DEFAULT_CONFIG = ParserConfig()
+
+
 # ── data structures ───────────────────────────────────────────────────────────
 
 @dataclass
@@ -60,6 +173,11 @@ class Amendment:
     content: str = ""
     amendment: str = ""
     warnings: list = field(default_factory=list)
+    # position in the document: header line to closing marker (or last line)
+    first_page: int = 0
+    last_page: int = 0
+    top_y: float = 0.0
+    bottom_y: float = 0.0
 
 
 # ── phase 1: span extraction ──────────────────────────────────────────────────
@@ -69,39 +187,136 @@ def is_bold(flags: int) -> bool:
     return bool(flags & 16)
 
 
-def extract_spans(pdf_path: str) -> list:
-    doc = fitz.open(pdf_path)
-    spans = []
-    for page_num, page in enumerate(doc, start=1):
-        blocks = page.get_text("dict", flags=fitz.TEXT_PRESERVE_WHITESPACE)["blocks"]
-        for block in blocks:
-            if block.get("type") != 0:  # text block
-                continue
-            for line in block.get("lines", []):
-                for span in line.get("spans", []):
-                    text = span["text"].strip()
-                    if not text:
-                        continue
-                    x = span["origin"][0]
-                    y = span["origin"][1]
-                    size = span["size"]
-                    bold = is_bold(span["flags"])
+def _iter_page_fields(page, config: ParserConfig = DEFAULT_CONFIG) -> Iterator[tuple]:
+    """Yield (x, y, text, bold, size) for every kept span on ``page``."""
+    layout = config.layout
+    blocks = page.get_text("dict", flags=fitz.TEXT_PRESERVE_WHITESPACE, clip=layout.clip(page.rect))["blocks"]
+    for block in blocks:
+        if block.get("type") != 0:  # text block
+            continue
+        for line in block.get("lines", []):
+            for span in line.get("spans", []):
+                text = span["text"].strip()
+                if not text:
+                    continue
+                x = span["origin"][0]
+                y = span["origin"][1]
+                size = span["size"]
+
+                # filter footer zone (the clip works on glyph boxes; this
+                # keeps the exact baseline rule)
+                if y > layout.footer_y:
+                    continue
+                # filter large-font watermark spans (e.g. "EN")
+                if size >= layout.watermark_size:
+                    continue
+
+                yield x, y, text, is_bold(span["flags"]), size
+
+
+def _page_spans(page, page_num: int, config: ParserConfig = DEFAULT_CONFIG) -> list:
+    """Extract the filtered spans of a single page."""
+    return [
+        Span(x=x, y=y, text=text, bold=bold, size=size, page_num=page_num)
+        for x, y, text, bold, size in _iter_page_fields(page, config)
+    ]
 
-                    # filter footer zone
-                    if y > FOOTER_Y_THRESHOLD:
-                        continue
-                    # filter large-font watermark spans (e.g. "EN")
-                    if size >= LARGE_FONT_THRESHOLD:
-                        continue
 
-                    spans.append(Span(x=x, y=y, text=text, bold=bold, size=size, page_num=page_num))
+def _open_pdf(source: PdfSource) -> "fitz.Document":
+    """Open a PDF given as a filesystem path or as raw bytes."""
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return fitz.open(stream=bytes(source), filetype="pdf")
+    return fitz.open(source)
+
+
+def iter_spans(source: PdfSource, start: int = 0, stop: Optional[int] = None,
+               config: ParserConfig = DEFAULT_CONFIG) -> Iterator[Span]:
+    """Yield spans page by page from pages [start, stop) (0-based).
+
+    Only one page's spans are held in memory at a time.
+    """
+    doc = _open_pdf(source)
+    try:
+        yield from _iter_doc_spans(doc, start, stop, config)
+    finally:
+        doc.close()
+
+
+def _iter_doc_spans(doc, start: int = 0, stop: Optional[int] = None,
+                    config: ParserConfig = DEFAULT_CONFIG) -> Iterator[Span]:
+    """Like :func:`iter_spans`, for a document that is already open."""
+    if stop is None:
+        stop = doc.page_count
+    for index in range(start, stop):
+        yield from _page_spans(doc[index], index + 1, config)
+
+
+def _extract_page_range(source: PdfSource, start: int, stop: int,
+                        config: ParserConfig = DEFAULT_CONFIG) -> tuple:
+    """Extract spans from pages [start, stop) (0-based) in a fresh document handle.
+
+    Runs inside worker processes, so it must open its own ``fitz`` document.
+    Returns ``(spans, page_stats)`` with one ``(page_num, seconds, span_count)``
+    entry per page.
+    """
+    spans = []
+    page_stats = []
+    doc = _open_pdf(source)
+    try:
+        for index in range(start, stop):
+            started = time.perf_counter()
+            page_spans = _page_spans(doc[index], index + 1, config)
+            page_stats.append((index + 1, time.perf_counter() - started, len(page_spans)))
+            spans.extend(page_spans)
+    finally:
+        doc.close()
+    return spans, page_stats
+
+
+def _page_ranges(page_count: int, chunks: int) -> list:
+    """Split ``range(page_count)`` into at most ``chunks`` contiguous (start, stop) pairs."""
+    chunks = max(1, min(chunks, page_count))
+    size, extra = divmod(page_count, chunks)
+    ranges = []
+    start = 0
+    for i in range(chunks):
+        stop = start + size + (1 if i < extra else 0)
+        ranges.append((start, stop))
+        start = stop
+    return ranges
+
+
+def extract_spans(source: PdfSource, workers: int = 1, page_stats: Optional[list] = None,
+                  config: ParserConfig = DEFAULT_CONFIG) -> list:
+    """Extract all spans of a PDF, optionally spreading pages over ``workers`` processes.
+
+    Page ranges are merged back in page order, so the result is identical to
+    the serial path regardless of the number of workers.  If ``page_stats`` is
+    given it is extended with a ``(page_num, seconds, span_count)`` tuple per page.
+    """
+    doc = _open_pdf(source)
+    page_count = doc.page_count
     doc.close()
+    if workers <= 1 or page_count <= 1:
+        results = [_extract_page_range(source, 0, page_count, config)]
+    else:
+        # A few chunks per worker keeps the pool busy when pages differ in cost.
+        ranges = _page_ranges(page_count, workers * 4)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(_extract_page_range, source, start, stop, config) for start, stop in ranges]
+            results = [future.result() for future in futures]
+
+    spans = []
+    for range_spans, range_stats in results:
+        spans.extend(range_spans)
+        if page_stats is not None:
+            page_stats.extend(range_stats)
     return spans
 
 
 # ── phase 2: line assembly ────────────────────────────────────────────────────
 
-def assemble_lines(spans: list) -> list:
+def assemble_lines(spans: list, config: ParserConfig = DEFAULT_CONFIG) -> list:
     """Group spans into logical lines by (page_num, y) proximity."""
     if not spans:
         return []
@@ -115,7 +330,7 @@ def assemble_lines(spans: list) -> list:
     for span in spans_sorted[1:]:
         prev = current_spans[-1]
         same_page = span.page_num == prev.page_num
-        close_y = abs(span.y - prev.y) <= LINE_Y_TOLERANCE
+        close_y = abs(span.y - prev.y) <= config.line_y_tolerance
 
         if same_page and close_y:
             current_spans.append(span)
@@ -129,6 +344,16 @@ def assemble_lines(spans: list) -> list:
     return lines
 
 
+def iter_lines(spans: Iterable[Span], config: ParserConfig = DEFAULT_CONFIG) -> Iterator[Line]:
+    """Streaming counterpart of :func:`assemble_lines`.
+
+    Spans must arrive grouped by page, as :func:`iter_spans` produces them;
+    lines are yielded as soon as their page is complete.
+    """
+    for _, page_spans in groupby(spans, key=lambda s: s.page_num):
+        yield from assemble_lines(list(page_spans), config)
+
+
 def _make_line(spans: list) -> Line:
     spans_sorted = sorted(spans, key=lambda s: s.x)
     return Line(y=spans_sorted[0].y, page_num=spans_sorted[0].page_num, spans=spans_sorted)
@@ -150,13 +375,931 @@ def line_size(line: Line) -> float:
     return max(s.size for s in line.spans)
 
 
+class LineRecord(NamedTuple):
+    """Everything the state machine needs to know about one logical line."""
+    text: str
+    bold: bool
+    size: float
+    left: list           # span texts left of the layout's column split
+    right: list          # span texts at or right of the column split
+    ambiguous_xs: list   # rounded x of spans in the layout's ambiguous band
+    page_num: int = 0
+    y: float = 0.0
+
+
+def line_record(line: Line, config: ParserConfig = DEFAULT_CONFIG) -> LineRecord:
+    left = []
+    right = []
+    ambiguous_xs = []
+    layout = config.layout_for(line.page_num)
+    for span in line.spans:
+        if layout.ambiguous_low <= span.x < layout.ambiguous_high:
+            ambiguous_xs.append(round(span.x))
+        if span.x < layout.column_split:
+            left.append(span.text)
+        else:
+            right.append(span.text)
+    return LineRecord(
+        text=line_text(line),
+        bold=line_is_bold(line),
+        size=line_size(line),
+        left=left,
+        right=right,
+        ambiguous_xs=ambiguous_xs,
+        page_num=line.page_num,
+        y=line.y,
+    )
+
+
+# ── columnar span store ───────────────────────────────────────────────────────
+#
+# Opt-in alternative to Span/Line objects: spans live in parallel NumPy arrays,
+# line grouping is a lexsort plus y-diff break detection, and column assignment
+# is a single mask over all spans.  Requires numpy.
+
+def _require_numpy():
+    if np is None:
+        raise RuntimeError("the columnar span store requires numpy (pip install numpy)")
+
+
+@dataclass
+class SpanColumns:
+    x: "np.ndarray"
+    y: "np.ndarray"
+    size: "np.ndarray"
+    bold: "np.ndarray"
+    page_num: "np.ndarray"
+    text: list
+
+    def __len__(self) -> int:
+        return len(self.text)
+
+    @classmethod
+    def from_fields(cls, xs, ys, sizes, bolds, pages, texts) -> "SpanColumns":
+        _require_numpy()
+        return cls(
+            x=np.asarray(xs, dtype=np.float64),
+            y=np.asarray(ys, dtype=np.float64),
+            size=np.asarray(sizes, dtype=np.float64),
+            bold=np.asarray(bolds, dtype=bool),
+            page_num=np.asarray(pages, dtype=np.int32),
+            text=list(texts),
+        )
+
+    @classmethod
+    def from_spans(cls, spans: list) -> "SpanColumns":
+        return cls.from_fields(
+            [s.x for s in spans], [s.y for s in spans], [s.size for s in spans],
+            [s.bold for s in spans], [s.page_num for s in spans], [s.text for s in spans],
+        )
+
+    @classmethod
+    def concat(cls, parts: list) -> "SpanColumns":
+        _require_numpy()
+        if not parts:
+            return cls.from_fields([], [], [], [], [], [])
+        return cls(
+            x=np.concatenate([p.x for p in parts]),
+            y=np.concatenate([p.y for p in parts]),
+            size=np.concatenate([p.size for p in parts]),
+            bold=np.concatenate([p.bold for p in parts]),
+            page_num=np.concatenate([p.page_num for p in parts]),
+            text=[t for p in parts for t in p.text],
+        )
+
+
+def _extract_columns_range(source: PdfSource, start: int, stop: int,
+                           config: ParserConfig = DEFAULT_CONFIG) -> tuple:
+    """Columnar counterpart of :func:`_extract_page_range`."""
+    xs, ys, sizes, bolds, pages, texts = [], [], [], [], [], []
+    page_stats = []
+    doc = _open_pdf(source)
+    try:
+        for index in range(start, stop):
+            started = time.perf_counter()
+            before = len(texts)
+            for x, y, text, bold, size in _iter_page_fields(doc[index], config):
+                xs.append(x)
+                ys.append(y)
+                sizes.append(size)
+                bolds.append(bold)
+                pages.append(index + 1)
+                texts.append(text)
+            page_stats.append((index + 1, time.perf_counter() - started, len(texts) - before))
+    finally:
+        doc.close()
+    return SpanColumns.from_fields(xs, ys, sizes, bolds, pages, texts), page_stats
+
+
+def extract_span_columns(source: PdfSource, workers: int = 1, page_stats: Optional[list] = None,
+                         config: ParserConfig = DEFAULT_CONFIG) -> SpanColumns:
+    """Columnar counterpart of :func:`extract_spans`."""
+    _require_numpy()
+    doc = _open_pdf(source)
+    page_count = doc.page_count
+    doc.close()
+    if workers <= 1 or page_count <= 1:
+        results = [_extract_columns_range(source, 0, page_count, config)]
+    else:
+        ranges = _page_ranges(page_count, workers * 4)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(_extract_columns_range, source, start, stop, config)
+                       for start, stop in ranges]
+            results = [future.result() for future in futures]
+
+    if page_stats is not None:
+        for _, range_stats in results:
+            page_stats.extend(range_stats)
+    return SpanColumns.concat([columns for columns, _ in results])
+
+
+def _span_bands(spans: SpanColumns, config: ParserConfig) -> tuple:
+    """Per-span column split and ambiguous band, honouring per-page layouts."""
+    layout = config.layout
+    if not config.page_layouts:
+        return layout.column_split, layout.ambiguous_low, layout.ambiguous_high
+    split = np.full(len(spans), layout.column_split, dtype=np.float64)
+    low = np.full(len(spans), layout.ambiguous_low, dtype=np.float64)
+    high = np.full(len(spans), layout.ambiguous_high, dtype=np.float64)
+    for page_num, page_layout in config.page_layouts:
+        on_page = spans.page_num == page_num
+        split[on_page] = page_layout.column_split
+        low[on_page] = page_layout.ambiguous_low
+        high[on_page] = page_layout.ambiguous_high
+    return split, low, high
+
+
+@dataclass
+class LineColumns:
+    """Spans sorted into line order, with ``starts[i]`` the first span of line i."""
+    spans: SpanColumns
+    starts: "np.ndarray"
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def _bounds(self) -> list:
+        return self.starts.tolist() + [len(self.spans)]
+
+    def records(self, config: ParserConfig = DEFAULT_CONFIG) -> Iterator[LineRecord]:
+        """Yield one :class:`LineRecord` per line, column split done by mask."""
+        if not len(self.starts):
+            return
+        spans = self.spans
+        bold = np.logical_and.reduceat(spans.bold, self.starts).tolist()
+        size = np.maximum.reduceat(spans.size, self.starts).tolist()
+        line_y = spans.y[self.starts].tolist()
+        line_page = spans.page_num[self.starts].tolist()
+        split, low, high = _span_bands(spans, config)
+        is_right = (spans.x >= split).tolist()
+        ambiguous = ((spans.x >= low) & (spans.x < high)).tolist()
+        xs = spans.x.tolist()
+        texts = spans.text
+        bounds = self._bounds()
+        for i in range(len(bold)):
+            lo, hi = bounds[i], bounds[i + 1]
+            left = []
+            right = []
+            for j in range(lo, hi):
+                (right if is_right[j] else left).append(texts[j])
+            yield LineRecord(
+                text=" ".join(texts[lo:hi]).strip(),
+                bold=bold[i],
+                size=size[i],
+                left=left,
+                right=right,
+                ambiguous_xs=[round(xs[j]) for j in range(lo, hi) if ambiguous[j]],
+                page_num=line_page[i],
+                y=line_y[i],
+            )
+
+    def to_lines(self) -> list:
+        """Materialise :class:`Line` objects (for interop with the object pipeline)."""
+        spans = self.spans
+        x, y, size = spans.x.tolist(), spans.y.tolist(), spans.size.tolist()
+        bold, page = spans.bold.tolist(), spans.page_num.tolist()
+        bounds = self._bounds()
+        lines = []
+        for lo, hi in zip(bounds, bounds[1:]):
+            line_spans = [
+                Span(x=x[j], y=y[j], text=spans.text[j], bold=bold[j], size=size[j], page_num=page[j])
+                for j in range(lo, hi)
+            ]
+            lines.append(Line(y=line_spans[0].y, page_num=line_spans[0].page_num, spans=line_spans))
+        return lines
+
+
+def assemble_line_columns(columns: SpanColumns, config: ParserConfig = DEFAULT_CONFIG) -> LineColumns:
+    """Vectorised counterpart of :func:`assemble_lines`."""
+    _require_numpy()
+    if not len(columns):
+        return LineColumns(spans=columns, starts=np.zeros(0, dtype=np.int64))
+
+    # sort by page, then y, then x (lexsort is stable, like sorted())
+    order = np.lexsort((columns.x, columns.y, columns.page_num))
+    page = columns.page_num[order]
+    y = columns.y[order]
+
+    breaks = np.ones(len(order), dtype=bool)
+    breaks[1:] = (page[1:] != page[:-1]) | (np.abs(np.diff(y)) > config.line_y_tolerance)
+    line_id = np.cumsum(breaks)
+
+    # order spans within each line by x, keeping y order for equal x
+    order = order[np.lexsort((columns.x[order], line_id))]
+    sorted_spans = SpanColumns(
+        x=columns.x[order],
+        y=columns.y[order],
+        size=columns.size[order],
+        bold=columns.bold[order],
+        page_num=columns.page_num[order],
+        text=[columns.text[i] for i in order.tolist()],
+    )
+    return LineColumns(spans=sorted_spans, starts=np.flatnonzero(breaks))
+
+
+# ── span cache ────────────────────────────────────────────────────────────────
+#
+# Phase-1 output keyed on the PDF's content hash plus the extraction parameters.
+# Each entry is a fixed-width record table followed by a UTF-8 text blob, so it
+# can be memory-mapped and, with numpy, viewed without copying.
+
+SPAN_CACHE_VERSION = 1
+DEFAULT_CACHE_MAX_BYTES = 512 * 1024 * 1024
+STALE_TMP_SECONDS = 3600    # an unfinished entry untouched this long was left by a writer that died
+
+_CACHE_MAGIC = b"EPSC"
+_CACHE_HEADER = struct.Struct("<4sIQQ")          # magic, version, span count, text bytes
+_CACHE_RECORD = struct.Struct("<dddiB3xII")      # x, y, size, page, bold, text offset, text length
+_CACHE_DTYPE = [
+    ("x", "<f8"), ("y", "<f8"), ("size", "<f8"), ("page_num", "<i4"),
+    ("bold", "u1"), ("pad", "V3"), ("text_offset", "<u4"), ("text_length", "<u4"),
+]
+
+
+def file_sha256(path: str, chunk_size: int = 1 << 20) -> str:
+    """Hex SHA-256 of a file, read in chunks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def source_sha256(source: PdfSource) -> str:
+    """Hex SHA-256 of a PDF given as a path or as raw bytes."""
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return hashlib.sha256(source).hexdigest()
+    return file_sha256(source)
+
+
+def default_cache_dir() -> str:
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "ep-parser", "spans")
+
+
+class SpanCache:
+    """On-disk cache of extracted spans with a size cap and LRU eviction.
+
+    Recency is tracked through file modification times, which are bumped on
+    every hit.
+    """
+
+    def __init__(self, directory: str, max_bytes: int = DEFAULT_CACHE_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+
+    def key(self, source: PdfSource, config: ParserConfig = DEFAULT_CONFIG,
+            fingerprint: Optional[str] = None) -> str:
+        """Cache key of a document; pass its ``fingerprint`` if already computed to skip hashing it again."""
+        params = f"v{SPAN_CACHE_VERSION};{config.layout.cache_params()};fitz={fitz.VersionBind}"
+        fingerprint = fingerprint or source_sha256(source)
+        return hashlib.sha256(f"{fingerprint};{params}".encode()).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key + ".spans")
+
+    def layouts(self) -> "LayoutCache":
+        """The calibrated-layout cache kept in the same directory."""
+        return LayoutCache(os.path.join(self.directory, "layouts.json"))
+
+    def load(self, key: str, columnar: bool = False):
+        """Return cached spans (a list, or SpanColumns if ``columnar``), or None on a miss.
+
+        Truncated, corrupt or outdated entries count as misses and are removed.
+        """
+        path = self._path(key)
+        try:
+            f = open(path, "rb")
+        except FileNotFoundError:
+            return None
+        with f:
+            try:
+                mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:  # empty file
+                mm = None
+        if mm is not None:
+            try:
+                spans = self._read(path, mm, columnar)
+            except (struct.error, UnicodeDecodeError):
+                spans = None
+            if spans is not None:
+                return spans
+            try:
+                mm.close()
+            except BufferError:  # a numpy view of a corrupt entry is still alive
+                pass
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        return None
+
+    @staticmethod
+    def _read(path: str, mm: mmap.mmap, columnar: bool):
+        """Decode an entry; None if it is outdated or its size disagrees with its header."""
+        magic, version, count, text_bytes = _CACHE_HEADER.unpack_from(mm, 0)
+        table_start = _CACHE_HEADER.size
+        text_start = table_start + count * _CACHE_RECORD.size
+        if magic != _CACHE_MAGIC or version != SPAN_CACHE_VERSION or len(mm) != text_start + text_bytes:
+            return None
+        os.utime(path)  # mark as recently used
+
+        text_blob = mm[text_start:text_start + text_bytes]
+        if columnar:
+            _require_numpy()
+            table = np.frombuffer(mm, dtype=_CACHE_DTYPE, count=count, offset=table_start)
+            texts = [
+                text_blob[o:o + n].decode("utf-8")
+                for o, n in zip(table["text_offset"].tolist(), table["text_length"].tolist())
+            ]
+            return SpanColumns(
+                x=table["x"], y=table["y"], size=table["size"],
+                bold=table["bold"].astype(bool), page_num=table["page_num"], text=texts,
+            )
+
+        spans = [
+            Span(x=x, y=y, text=text_blob[o:o + n].decode("utf-8"), bold=bool(b), size=size, page_num=p)
+            for x, y, size, p, b, o, n in _CACHE_RECORD.iter_unpack(mm[table_start:text_start])
+        ]
+        mm.close()
+        return spans
+
+    def store(self, key: str, spans) -> None:
+        """Write ``spans`` (a list of Span or a SpanColumns) and evict old entries."""
+        if isinstance(spans, SpanColumns):
+            rows = zip(spans.x.tolist(), spans.y.tolist(), spans.size.tolist(),
+                       spans.page_num.tolist(), spans.bold.tolist(), spans.text)
+        else:
+            rows = ((s.x, s.y, s.size, s.page_num, s.bold, s.text) for s in spans)
+
+        writer = self.writer(key)
+        try:
+            for row in rows:
+                writer.add(*row)
+        except BaseException:
+            writer.discard()
+            raise
+        writer.commit()
+
+    def writer(self, key: str) -> "_SpanCacheWriter":
+        """An entry written span by span, for spans that are streamed rather than collected."""
+        os.makedirs(self.directory, exist_ok=True)
+        return _SpanCacheWriter(self, key)
+
+    def results(self, max_bytes: int = None, fast_fingerprint: bool = False) -> "ResultCache":
+        """The parse-result cache kept below the same directory."""
+        return ResultCache(os.path.join(self.directory, "results"),
+                           max_bytes=DEFAULT_RESULT_CACHE_MAX_BYTES if max_bytes is None else max_bytes,
+                           fast_fingerprint=fast_fingerprint)
+
+    def evict(self) -> None:
+        """Delete least recently used entries until the cache fits ``max_bytes``."""
+        _evict_lru(self.directory, ".spans", self.max_bytes)
+
+
+class _SpanCacheWriter:
+    """Builds one cache entry incrementally: records go to the entry file, text to a side file.
+
+    Nothing is visible under the entry's name until :meth:`commit`, which
+    fills in the header, appends the text and renames the file into place.
+    """
+
+    def __init__(self, cache: SpanCache, key: str):
+        self.cache = cache
+        self.path = cache._path(key)
+        self.tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        self.text_path = f"{self.path}.{os.getpid()}.text.tmp"
+        self.table = open(self.tmp_path, "wb")
+        self.text = open(self.text_path, "w+b")
+        self.table.write(b"\0" * _CACHE_HEADER.size)
+        self.count = 0
+        self.text_bytes = 0
+
+    def add(self, x: float, y: float, size: float, page_num: int, bold: bool, text: str) -> None:
+        encoded = text.encode("utf-8")
+        self.table.write(_CACHE_RECORD.pack(x, y, size, page_num, bold, self.text_bytes, len(encoded)))
+        self.text.write(encoded)
+        self.text_bytes += len(encoded)
+        self.count += 1
+
+    def commit(self) -> None:
+        self.table.seek(0)
+        self.table.write(_CACHE_HEADER.pack(_CACHE_MAGIC, SPAN_CACHE_VERSION, self.count, self.text_bytes))
+        self.table.seek(0, os.SEEK_END)
+        self.text.seek(0)
+        shutil.copyfileobj(self.text, self.table)
+        self.table.close()
+        self.text.close()
+        os.remove(self.text_path)
+        os.replace(self.tmp_path, self.path)
+        self.cache.evict()
+
+    def discard(self) -> None:
+        self.table.close()
+        self.text.close()
+        for path in (self.tmp_path, self.text_path):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+
+def _evict_lru(directory: str, suffix: str, max_bytes: int) -> None:
+    """Delete the least recently modified ``*suffix`` files until the rest fit ``max_bytes``.
+
+    Unfinished ``*.tmp`` entries older than ``STALE_TMP_SECONDS`` are deleted too.
+    """
+    entries = []
+    stale = time.time() - STALE_TMP_SECONDS
+    for entry in os.scandir(directory):
+        if entry.name.endswith(".tmp"):
+            try:
+                if entry.stat().st_mtime < stale:
+                    os.remove(entry.path)
+            except FileNotFoundError:
+                pass
+        elif entry.name.endswith(suffix):
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:  # evicted by another process meanwhile
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        total -= size
+
+
+def load_spans(source: PdfSource, workers: int = 1, columnar: bool = False,
+               cache: Optional[SpanCache] = None, page_stats: Optional[list] = None,
+               config: ParserConfig = DEFAULT_CONFIG, fingerprint: Optional[str] = None):
+    """Phase 1 with optional caching: spans as a list, or SpanColumns if ``columnar``.
+
+    ``page_stats`` is only filled in when extraction actually runs (cache miss).
+    ``fingerprint`` is the document's content hash, if the caller already has it.
+    """
+    key = None
+    if cache is not None:
+        key = cache.key(source, config, fingerprint)
+        spans = cache.load(key, columnar=columnar)
+        if spans is not None:
+            return spans
+    if columnar:
+        spans = extract_span_columns(source, workers=workers, page_stats=page_stats, config=config)
+    else:
+        spans = extract_spans(source, workers=workers, page_stats=page_stats, config=config)
+    if cache is not None:
+        cache.store(key, spans)
+    return spans
+
+
+# ── result cache ──────────────────────────────────────────────────────────────
+#
+# Whole parse results keyed on the PDF's content, the parser version and the
+# settings, so a document submitted again is answered without opening it.
+# Entries are compact JSON; recency is tracked through mtimes as above.
+
+DEFAULT_RESULT_CACHE_MAX_BYTES = 256 * 1024 * 1024
+FAST_FINGERPRINT_SAMPLES = 16            # chunks read by the fast fingerprint, first and last included
+FAST_FINGERPRINT_CHUNK = 64 * 1024
+
+
+_PARSER_VERSION = None
+
+
+def parser_version() -> str:
+    """Version of everything besides the settings that shapes the output.
+
+    Derived from this module's source and the PyMuPDF version, so any change
+    to the parser invalidates cached results and checkpoints without anyone
+    having to remember a version bump.
+    """
+    global _PARSER_VERSION
+    if _PARSER_VERSION is None:
+        with open(__file__, "rb") as f:
+            source = hashlib.sha256(f.read()).hexdigest()[:16]
+        _PARSER_VERSION = f"{source}+pymupdf{fitz.VersionBind}"
+    return _PARSER_VERSION
+
+
+def config_hash(config: ParserConfig = DEFAULT_CONFIG, **options) -> str:
+    """Short hash of the parser config plus any further options (format, fields, …)."""
+    params = f"{config!r};" + ";".join(f"{name}={options[name]!r}" for name in sorted(options))
+    return hashlib.sha256(params.encode()).hexdigest()[:16]
+
+
+def source_fingerprint(source: PdfSource, fast: bool = False) -> str:
+    """Content hash of a PDF: its SHA-256, or with ``fast`` a hash of sampled chunks.
+
+    The fast fingerprint reads at most ``FAST_FINGERPRINT_SAMPLES`` chunks
+    spread evenly over the file, including its start and end (where
+    incremental updates are appended), plus the file size.  It can miss an
+    in-place edit between the samples, so it is only for trusted archives.
+    """
+    if not fast:
+        return source_sha256(source)
+    digest = hashlib.sha256()
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        data = memoryview(source)
+        size = len(data)
+        read = lambda offset: data[offset:offset + FAST_FINGERPRINT_CHUNK]  # noqa: E731
+        f = None
+    else:
+        f = open(source, "rb")
+        size = os.fstat(f.fileno()).st_size
+
+        def read(offset):
+            f.seek(offset)
+            return f.read(FAST_FINGERPRINT_CHUNK)
+    try:
+        digest.update(f"{size};".encode())
+        last = max(size - FAST_FINGERPRINT_CHUNK, 0)
+        offsets = sorted({last * i // (FAST_FINGERPRINT_SAMPLES - 1) for i in range(FAST_FINGERPRINT_SAMPLES)})
+        for offset in offsets:
+            digest.update(read(offset))
+    finally:
+        if f is not None:
+            f.close()
+    return "fast:" + digest.hexdigest()
+
+
+class ResultCache:
+    """On-disk cache of complete parse results with a size cap and LRU eviction."""
+
+    def __init__(self, directory: str, max_bytes: int = DEFAULT_RESULT_CACHE_MAX_BYTES,
+                 fast_fingerprint: bool = False):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.fast_fingerprint = fast_fingerprint
+
+    def fingerprint(self, source: PdfSource) -> str:
+        """The document fingerprint this cache keys on (see :func:`source_fingerprint`)."""
+        return source_fingerprint(source, fast=self.fast_fingerprint)
+
+    def key(self, source: PdfSource, config: ParserConfig = DEFAULT_CONFIG,
+            calibrate_columns: bool = False, fingerprint: Optional[str] = None) -> str:
+        """Cache key of a document; pass its :meth:`fingerprint` if already computed."""
+        params = f"{parser_version()};{config_hash(config, calibrate_columns=calibrate_columns)}"
+        fingerprint = fingerprint or self.fingerprint(source)
+        return hashlib.sha256(f"{fingerprint};{params}".encode()).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key + ".json")
+
+    def get(self, key: str) -> Optional[list]:
+        """The cached amendments (all fields and positions), or None on a miss."""
+        path = self._path(key)
+        try:
+            with open(path, encoding="utf-8") as f:
+                records = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+        os.utime(path)  # mark as recently used
+        return [Amendment(**r) for r in records]
+
+    def put(self, key: str, amendments: list) -> None:
+        """Store a complete (unfiltered, not header-only) result and evict old entries."""
+        writer = self.writer(key)
+        try:
+            for a in amendments:
+                writer.add(a)
+        except BaseException:
+            writer.discard()
+            raise
+        writer.commit()
+
+    def writer(self, key: str) -> "_ResultCacheWriter":
+        """An entry written one amendment at a time, for results that are streamed."""
+        os.makedirs(self.directory, exist_ok=True)
+        return _ResultCacheWriter(self, key)
+
+
+class _ResultCacheWriter:
+    """Appends amendments to a temporary JSON array; :meth:`commit` moves it into place."""
+
+    def __init__(self, cache: ResultCache, key: str):
+        self.cache = cache
+        self.path = cache._path(key)
+        self.tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        self.f = open(self.tmp_path, "w", encoding="utf-8")
+        self.f.write("[")
+        self.count = 0
+
+    def add(self, a: Amendment) -> None:
+        if self.count:
+            self.f.write(",")
+        self.f.write(json.dumps(asdict(a), ensure_ascii=False, separators=(",", ":")))
+        self.count += 1
+
+    def commit(self) -> None:
+        self.f.write("]")
+        self.f.close()
+        os.replace(self.tmp_path, self.path)
+        _evict_lru(self.cache.directory, ".json", self.cache.max_bytes)
+
+    def discard(self) -> None:
+        self.f.close()
+        try:
+            os.remove(self.tmp_path)
+        except FileNotFoundError:
+            pass
+
+
+# ── column calibration ────────────────────────────────────────────────────────
+#
+# For documents whose margins differ from their layout profile.  The left and
+# right column edges are the two dominant span x-origins; the profile's column
+# split and ambiguous band are mapped linearly from its reference edges onto
+# the measured ones.  Pages with a clearly different geometry (landscape
+# inserts) get their own layout.
+
+CALIBRATION_MIN_GAP = 100     # pts between the two column edges
+CALIBRATION_MIN_SUPPORT = 8   # spans a page needs at its own right edge to override the document
+CALIBRATION_TOLERANCE = 1     # measured edges this close to the reference keep the profile
+
+
+class _XHistogram:
+    """Span counts per whole-point x-origin bin, plus the exact x sum of each bin."""
+
+    def __init__(self):
+        self.counts = Counter()
+        self.sums = Counter()
+
+    def add(self, x: float) -> None:
+        self.counts[round(x)] += 1
+        self.sums[round(x)] += x
+
+    def update(self, other: "_XHistogram") -> None:
+        self.counts.update(other.counts)
+        self.sums.update(other.sums)
+
+    def near(self, x: float) -> int:
+        """Spans within a point of ``x``."""
+        return sum(self.counts[b] for b in (round(x) - 1, round(x), round(x) + 1))
+
+    def column_edges(self) -> Optional[tuple]:
+        """Mean x of the two fullest bins at least CALIBRATION_MIN_GAP apart, left first."""
+        ranked = self.counts.most_common()
+        if not ranked:
+            return None
+        first = ranked[0][0]
+        for x, _ in ranked[1:]:
+            if abs(x - first) >= CALIBRATION_MIN_GAP:
+                left, right = sorted((first, x))
+                return self.sums[left] / self.counts[left], self.sums[right] / self.counts[right]
+        return None
+
+
+def _x_histograms(spans) -> tuple:
+    """Document and per-page (``{page_num: histogram}``) x-origin histograms, in one pass."""
+    if isinstance(spans, SpanColumns):
+        pairs = zip(spans.x.tolist(), spans.page_num.tolist())
+    else:
+        pairs = ((s.x, s.page_num) for s in spans)
+    pages = {}
+    for x, page_num in pairs:
+        page = pages.get(page_num)
+        if page is None:
+            page = pages[page_num] = _XHistogram()
+        page.add(x)
+    document = _XHistogram()
+    for page in pages.values():
+        document.update(page)
+    return document, pages
+
+
+def _fit_layout(base: LayoutProfile, left: float, right: float) -> LayoutProfile:
+    """``base`` with its column bands moved onto measured column edges."""
+    if (abs(left - base.left_column_x) <= CALIBRATION_TOLERANCE
+            and abs(right - base.right_column_x) <= CALIBRATION_TOLERANCE):
+        return base
+    scale = (right - left) / (base.right_column_x - base.left_column_x)
+
+    def move(x: float) -> float:
+        return round(left + (x - base.left_column_x) * scale, 1)
+
+    return replace(
+        base, name=f"{base.name}+calibrated", column_split=move(base.column_split),
+        ambiguous_low=move(base.ambiguous_low), ambiguous_high=move(base.ambiguous_high),
+        left_column_x=round(left, 1), right_column_x=round(right, 1),
+    )
+
+
+def geometry_fingerprint(histogram: _XHistogram, base: LayoutProfile) -> str:
+    """Key for documents sharing a template: the profile plus the coarse x-origin peaks.
+
+    Peaks are 5 pt bins holding at least 2 % of all spans, so documents from
+    the same template agree even when their text differs.
+    """
+    coarse = Counter()
+    for x, count in histogram.counts.items():
+        coarse[x // 5] += count
+    total = sum(coarse.values())
+    peaks = sorted(b * 5 for b, count in coarse.items() if count * 50 >= total)
+    return hashlib.sha256(f"{base!r};{peaks}".encode()).hexdigest()[:32]
+
+
+class LayoutCache:
+    """Calibrated document layouts by geometry fingerprint, kept in one JSON file."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._entries = None
+
+    def _load(self) -> dict:
+        if self._entries is None:
+            try:
+                with open(self.path, encoding="utf-8") as f:
+                    self._entries = json.load(f)
+            except (FileNotFoundError, ValueError):
+                self._entries = {}
+        return self._entries
+
+    def get(self, fingerprint: str) -> Optional[LayoutProfile]:
+        fields = self._load().get(fingerprint)
+        return LayoutProfile(**fields) if fields is not None else None
+
+    def put(self, fingerprint: str, layout: LayoutProfile) -> None:
+        entries = self._load()
+        entries[fingerprint] = layout.__dict__.copy()
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(entries, f, indent=2)
+        os.replace(tmp_path, self.path)
+
+
+def calibrate(spans, config: ParserConfig = DEFAULT_CONFIG,
+              cache: Optional[LayoutCache] = None) -> ParserConfig:
+    """Return ``config`` with its layout fitted to the column edges found in ``spans``.
+
+    The document layout is looked up in ``cache`` by geometry fingerprint
+    before measuring; per-page overrides are always measured.  Documents that
+    already match their profile get ``config`` back unchanged.
+    """
+    base = config.layout
+    document, pages = _x_histograms(spans)
+    layout = None
+    fingerprint = geometry_fingerprint(document, base)
+    if cache is not None:
+        layout = cache.get(fingerprint)
+    if layout is None:
+        edges = document.column_edges()
+        layout = _fit_layout(base, *edges) if edges else base
+        if cache is not None:
+            cache.put(fingerprint, layout)
+
+    page_layouts = {}
+    for page_num, histogram in pages.items():
+        if histogram.near(layout.right_column_x) >= CALIBRATION_MIN_SUPPORT:
+            continue  # the page has the document's right column
+        edges = histogram.column_edges()
+        if edges and histogram.near(edges[1]) >= CALIBRATION_MIN_SUPPORT:
+            page_layout = _fit_layout(base, *edges)
+            if page_layout != layout:
+                page_layouts[page_num] = page_layout
+
+    if layout is base and not page_layouts:
+        return config
+    return replace(config, layout=layout, page_layouts=page_layouts)
+
+
+# ── amendment filters ─────────────────────────────────────────────────────────
+
+def _term_re(term: str) -> "re.Pattern":
+    """Case-insensitive match of ``term`` as whole words ("Article 5" ≠ "Article 50")."""
+    return re.compile(r"(?<!\w)" + re.escape(term) + r"(?!\w)", re.IGNORECASE)
+
+
+def parse_id_ranges(spec: str) -> frozenset:
+    """Parse an id specification such as ``"100-150"`` or ``"1,5,7-9"``."""
+    ids = set()
+    for part in spec.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        low, sep, high = part.partition("-")
+        if sep:
+            ids.update(range(int(low), int(high) + 1))
+        else:
+            ids.add(int(low))
+    return frozenset(ids)
+
+
+@dataclass(frozen=True)
+class AmendmentFilter:
+    """Predicates evaluated inside the state machine.
+
+    ``ids`` is checked at the header, ``author``/``section`` as soon as the
+    author and section lines are complete; amendments that fail never have
+    their table text accumulated.  Parsing stops after ``limit`` matches, or
+    once the headers pass the largest requested id (amendment numbers are
+    assumed to increase through the document).
+    """
+    author: Optional[str] = None
+    section: Optional[str] = None
+    ids: Optional[frozenset] = None
+    limit: Optional[int] = None
+    _max_id: int = field(default=-1, init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        if self.ids:
+            object.__setattr__(self, "_max_id", max(self.ids))  # checked at every header
+
+    def accepts_id(self, n: int) -> bool:
+        return self.ids is None or n in self.ids
+
+    def ids_exhausted(self, n: int) -> bool:
+        return self.ids is not None and n > self._max_id
+
+    def accepts_header(self, authors: str, section: str) -> bool:
+        if self.author is not None and not _term_re(self.author).search(authors):
+            return False
+        if self.section is not None and not _term_re(self.section).search(section):
+            return False
+        return True
+
+    def apply(self, amendments: Iterable[Amendment]) -> list:
+        """Select from already parsed amendments exactly as the state machine would."""
+        selected = []
+        for a in amendments:
+            if self.limit is not None and len(selected) >= self.limit:
+                break
+            n = int(AMENDMENT_RE.match(a.id).group(1))
+            if self.ids_exhausted(n):
+                break
+            if self.accepts_id(n) and self.accepts_header(a.authors, a.section):
+                selected.append(a)
+        return selected
+
+
 # ── phase 3: state machine ────────────────────────────────────────────────────
 
-def parse_amendments(lines: list) -> list:
-    amendments = []
+def parse_amendments(lines: list, select: Optional[AmendmentFilter] = None,
+                     header_only: bool = False, config: ParserConfig = DEFAULT_CONFIG) -> list:
+    return list(iter_amendments(lines, select=select, header_only=header_only, config=config))
+
+
+def _join_authors(author_lines: list) -> str:
+    # When a line ends with a comma the text wrapped within a single author
+    # list — continue with a space.  Otherwise separate distinct entries with "; ".
+    authors_joined = ""
+    for part in author_lines:
+        if not authors_joined:
+            authors_joined = part
+        elif authors_joined.endswith(","):
+            authors_joined += " " + part
+        else:
+            authors_joined += "; " + part
+    return authors_joined
+
+
+def iter_amendments(lines: Iterable[Line], prev_id_num: int = 0,
+                    select: Optional[AmendmentFilter] = None,
+                    header_only: bool = False,
+                    config: ParserConfig = DEFAULT_CONFIG) -> Iterator[Amendment]:
+    """Run the state machine over ``lines``, yielding each amendment once it is closed.
+
+    An amendment is complete as soon as its ``Or. xx`` marker is seen (or the
+    next header / end of input arrives, for blocks without a marker).
+    ``prev_id_num`` is the number of the amendment preceding ``lines`` when
+    parsing starts mid-document, so the sequence check carries over.
+    ``select`` filters amendments as early as possible and stops consuming
+    ``lines`` once nothing more can match.
+    With ``header_only`` each amendment is closed at the start of its table:
+    ``content`` and ``amendment`` stay empty, table lines are never split into
+    columns, and only the header warnings (``missing_author``,
+    ``non_sequential_id``) are reported.
+    """
     state = "PREAMBLE"
     current: Optional[Amendment] = None
-    prev_id_num = 0
+    header_checked = False  # select's author/section predicates already passed
+    emitted = 0
 
     # accumulator lines for current amendment table body
     left_lines = []   # original text lines
@@ -165,31 +1308,25 @@ def parse_amendments(lines: list) -> list:
     author_lines = []
     has_language_marker = False
 
-    def flush_amendment():
+    def flush_amendment() -> Optional[Amendment]:
         nonlocal current, left_lines, right_lines, section_parts, author_lines, has_language_marker
         if current is None:
-            return
+            return None
 
-        # Join author lines.  When a line ends with a comma the text wrapped
-        # within a single author list — continue with a space.  Otherwise
-        # separate distinct entries with "; ".
-        authors_joined = ""
-        for part in author_lines:
-            if not authors_joined:
-                authors_joined = part
-            elif authors_joined.endswith(","):
-                authors_joined += " " + part
-            else:
-                authors_joined += "; " + part
-        current.authors = authors_joined
+        current.authors = _join_authors(author_lines)
         current.section = " / ".join(section_parts)
+        if select is not None and not header_checked \
+                and not select.accepts_header(current.authors, current.section):
+            discard_amendment()
+            return None
         current.content = "\n".join(left_lines).strip()
         current.amendment = "\n".join(right_lines).strip()
 
         # warnings
         if not current.authors:
             current.warnings.append("missing_author")
-        if not current.content and not current.amendment:
+        # (a header-only pass never reads the table, so its checks do not apply)
+        if not current.content and not current.amendment and not header_only:
             current.warnings.append("both_columns_empty")
         if (current.content and len(current.content) < 3
                 and current.content.lower() != "deleted"):
@@ -197,13 +1334,23 @@ def parse_amendments(lines: list) -> list:
         if (current.amendment and len(current.amendment) < 3
                 and current.amendment.lower() != "deleted"):
             current.warnings.append("suspiciously_short_column")
-        if not has_language_marker:
+        if not has_language_marker and not header_only:
             current.warnings.append("no_language_marker")
         # check for footer text leakage
         if DOC_CODE_RE.search(current.content) or DOC_CODE_RE.search(current.amendment):
             current.warnings.append("footer_text_leaked")
 
-        amendments.append(current)
+        finished = current
+        current = None
+        left_lines = []
+        right_lines = []
+        section_parts = []
+        author_lines = []
+        has_language_marker = False
+        return finished
+
+    def discard_amendment():
+        nonlocal current, left_lines, right_lines, section_parts, author_lines, has_language_marker
         current = None
         left_lines = []
         right_lines = []
@@ -211,70 +1358,83 @@ def parse_amendments(lines: list) -> list:
         author_lines = []
         has_language_marker = False
 
-    def start_amendment(id_str: str, id_num: int):
+    def start_amendment(id_str: str, id_num: int, record: LineRecord):
         nonlocal current, prev_id_num, has_language_marker
-        flush_amendment()
         has_language_marker = False
-        current = Amendment(id=id_str)
+        current = Amendment(id=id_str, first_page=record.page_num, last_page=record.page_num,
+                            top_y=record.y, bottom_y=record.y)
         if id_num != prev_id_num + 1 and prev_id_num != 0:
             current.warnings.append(
                 f"non_sequential_id: expected {prev_id_num + 1}, got {id_num}"
             )
         prev_id_num = id_num
 
-    def add_table_text(line: Line):
+    def add_table_text(record: LineRecord):
         """Split a table body line into left/right column accumulators."""
-        left_parts = []
-        right_parts = []
-        has_ambiguous = False
-
-        ambiguous_xs = []
-        for span in line.spans:
-            if AMBIGUOUS_LOW <= span.x < AMBIGUOUS_HIGH:
-                ambiguous_xs.append(round(span.x))
-            if span.x < COLUMN_SPLIT_X:
-                left_parts.append(span.text)
-            else:
-                right_parts.append(span.text)
-
-        if ambiguous_xs:
-            xs_str = ", ".join(str(x) for x in ambiguous_xs)
+        if record.ambiguous_xs:
+            xs_str = ", ".join(str(x) for x in record.ambiguous_xs)
             current.warnings.append(
-                f"ambiguous_column_split: {len(ambiguous_xs)} spans near boundary at x≈{xs_str}"
+                f"ambiguous_column_split: {len(record.ambiguous_xs)} spans near boundary at x≈{xs_str}"
             )
 
-        if left_parts:
-            left_lines.append(" ".join(left_parts))
-        if right_parts:
-            right_lines.append(" ".join(right_parts))
+        if record.left:
+            left_lines.append(" ".join(record.left))
+        if record.right:
+            right_lines.append(" ".join(record.right))
 
-    for line in lines:
-        text = line_text(line)
+    if isinstance(lines, LineColumns):
+        records = lines.records(config)
+    else:
+        records = (line_record(line, config) for line in lines)
+
+    for record in records:
+        text = record.text
         if not text:
             continue
 
-        bold = line_is_bold(line)
-        min_x = line_min_x(line)
-        size = line_size(line)
+        bold = record.bold
+        size = record.size
 
         # ── detect amendment header anywhere ────────────────────────────────
         m = AMENDMENT_RE.match(text)
-        if m and bold and size >= 11:
+        if m and bold and size >= config.header_min_size:
             id_num = int(m.group(1))
-            start_amendment(text, id_num)
+            finished = flush_amendment()
+            if finished is not None:
+                yield finished
+                emitted += 1
+            if select is not None:
+                if select.limit is not None and emitted >= select.limit:
+                    return
+                if select.ids_exhausted(id_num):
+                    return
+            start_amendment(text, id_num, record)
             state_ref = "AMENDMENT_HEADER"
             # use a mutable container to allow nested function access
             # (we'll use direct variable since Python closures read enclosing scope)
             state = "AUTHORS"
+            header_checked = False
+            if select is not None and not select.accepts_id(id_num):
+                discard_amendment()
+                state = "SKIP"  # ignore everything until the next header
             continue
 
-        if state == "PREAMBLE":
+        if state in ("PREAMBLE", "SKIP"):
             continue
 
+        current.last_page = record.page_num
+        current.bottom_y = record.y
+
         # ── language marker → end of amendment ──────────────────────────────
         if LANGUAGE_MARKER_RE.match(text):
             has_language_marker = True
             state = "PREAMBLE"  # wait for next amendment header
+            finished = flush_amendment()
+            if finished is not None:
+                yield finished
+                emitted += 1
+                if select is not None and select.limit is not None and emitted >= select.limit:
+                    return
             continue
 
         if state == "AUTHORS":
@@ -283,15 +1443,27 @@ def parse_amendments(lines: list) -> list:
             # known committee header variants ("Motion for a resolution / Amendment",
             # "Text proposed by the Commission / Amendment", "Proposal for rejection",
             # or no explicit header at all).
-            right_spans = [s for s in line.spans if s.x >= COLUMN_SPLIT_X]
-            if right_spans:
-                left_spans = [s for s in line.spans if s.x < COLUMN_SPLIT_X]
+            if record.right:
                 state = "TABLE_BODY"
-                if not left_spans:
+                if select is not None:
+                    if not select.accepts_header(_join_authors(author_lines), " / ".join(section_parts)):
+                        discard_amendment()
+                        state = "SKIP"
+                        continue
+                    header_checked = True
+                if header_only:
+                    state = "PREAMBLE"  # nothing after the header block is needed
+                    finished = flush_amendment()
+                    yield finished
+                    emitted += 1
+                    if select is not None and select.limit is not None and emitted >= select.limit:
+                        return
+                    continue
+                if not record.left:
                     # Right-column-only line: skip if it is a known column-header
                     # label, otherwise treat as the first piece of amendment content.
                     if not TABLE_COLUMN_LABEL_RE.match(text):
-                        add_table_text(line)
+                        add_table_text(record)
                 # Both-column lines are header rows — transition state but skip content.
                 continue
 
@@ -301,14 +1473,10 @@ def parse_amendments(lines: list) -> list:
                 continue
 
             # bold size-12 line = author or section identifier
-            if bold and size >= 11:
+            if bold and size >= config.header_min_size:
                 # Heuristic: lines containing known structural keywords are section
                 # labels; everything else is an author name (until a section is seen).
-                SECTION_KEYWORDS = (
-                    "Motion for a resolution", "Paragraph", "Recital",
-                    "Article", "Heading", "Title", "Annex", "Proposal",
-                )
-                if any(kw in text for kw in SECTION_KEYWORDS):
+                if any(kw in text for kw in config.section_keywords):
                     section_parts.append(text)
                 else:
                     # Still in author zone, or continuation of section identifier.
@@ -324,58 +1492,1646 @@ def parse_amendments(lines: list) -> list:
                 continue
 
         elif state == "TABLE_BODY":
-            add_table_text(line)
-
-    flush_amendment()
-    return amendments
+            add_table_text(record)
+
+    finished = flush_amendment()
+    if finished is not None:
+        yield finished
+
+
+# ── phase 3, sharded ──────────────────────────────────────────────────────────
+#
+# Every amendment header resets the state machine, so the line stream can be
+# cut at headers and the pieces parsed independently.  The only state that
+# crosses a header is the previous amendment number for the sequence check,
+# and that is known up front from the header scan.
+
+SHARD_MIN_AMENDMENTS = 1000   # below this, a pool costs more than it saves
+
+_SHARD_LINES: list = []       # set in each worker process by _init_shard_worker
+
+
+def header_positions(lines: list, config: ParserConfig = DEFAULT_CONFIG) -> list:
+    """(line index, amendment number) of every header line, as the state machine detects them."""
+    positions = []
+    for index, line in enumerate(lines):
+        if not line.spans[0].bold:
+            continue  # cheap reject: header lines are bold throughout
+        m = AMENDMENT_RE.match(line_text(line))
+        if m and line_is_bold(line) and line_size(line) >= config.header_min_size:
+            positions.append((index, int(m.group(1))))
+    return positions
+
+
+def _shard_bounds(positions: list, line_count: int, shards: int) -> list:
+    """Cut before evenly spaced headers: ``(start, stop, prev_id_num)`` per shard."""
+    shards = max(1, min(shards, len(positions)))
+    per_shard, extra = divmod(len(positions), shards)
+    bounds = []
+    first = 0  # index into positions of the shard's first header
+    for i in range(shards):
+        start = 0 if i == 0 else positions[first][0]
+        prev_id_num = positions[first - 1][1] if first else 0
+        first += per_shard + (1 if i < extra else 0)
+        stop = positions[first][0] if first < len(positions) else line_count
+        bounds.append((start, stop, prev_id_num))
+    return bounds
+
+
+def _init_shard_worker(lines: list) -> None:
+    global _SHARD_LINES
+    _SHARD_LINES = lines
+
+
+def _parse_shard(start: int, stop: int, prev_id_num: int, header_only: bool,
+                 config: ParserConfig, lines: Optional[list] = None) -> list:
+    if lines is None:
+        lines = _SHARD_LINES[start:stop]
+    return list(iter_amendments(lines, prev_id_num=prev_id_num, header_only=header_only, config=config))
+
+
+def parse_amendments_sharded(lines: list, workers: int, header_only: bool = False,
+                             config: ParserConfig = DEFAULT_CONFIG) -> list:
+    """Parallel :func:`parse_amendments`: shards cut at headers, run on ``workers`` processes.
+
+    The result is identical to the serial pass, including ``non_sequential_id``
+    across shard edges.  Where ``fork`` is available and the calling process
+    has a single thread, the workers inherit ``lines`` instead of receiving
+    a pickled copy.  Documents with fewer than :data:`SHARD_MIN_AMENDMENTS`
+    headers are parsed serially.
+    """
+    positions = header_positions(lines, config)
+    if workers <= 1 or len(positions) < SHARD_MIN_AMENDMENTS:
+        return parse_amendments(lines, header_only=header_only, config=config)
+
+    bounds = _shard_bounds(positions, len(lines), workers * 2)
+    methods = multiprocessing.get_all_start_methods()
+    if "fork" in methods and threading.active_count() == 1:
+        # Each call gets its own pool; forked workers inherit ``lines`` from initargs.
+        pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("fork"),
+                                   initializer=_init_shard_worker, initargs=(lines,))
+        shard_lines = [None] * len(bounds)
+    else:
+        # Forking a multi-threaded process can deadlock the child, so workers
+        # start fresh (never by fork) and receive their shard pickled.
+        context = multiprocessing.get_context("forkserver" if "forkserver" in methods else None)
+        pool = ProcessPoolExecutor(max_workers=workers, mp_context=context)
+        shard_lines = [lines[start:stop] for start, stop, _ in bounds]
+    with pool:
+        futures = [
+            pool.submit(_parse_shard, start, stop, prev_id_num, header_only, config, shard)
+            for (start, stop, prev_id_num), shard in zip(bounds, shard_lines)
+        ]
+        return [a for future in futures for a in future.result()]
 
 
 # ── phase 4: output ───────────────────────────────────────────────────────────
 
-def amendments_to_json(amendments: list) -> list:
-    return [
-        {
-            "id": a.id,
-            "authors": a.authors,
-            "section": a.section,
-            "content": a.content,
-            "amendment": a.amendment,
-            "warnings": a.warnings,
+FIELDS = ("id", "authors", "section", "content", "amendment", "warnings")
+TABLE_FIELDS = ("content", "amendment", "warnings")  # need the table body parsed
+
+
+def parse_fields(spec: str) -> tuple:
+    """Parse a comma-separated field list into output order, e.g. ``"section,id"``."""
+    names = {name.strip() for name in spec.split(",") if name.strip()}
+    unknown = names.difference(FIELDS)
+    if unknown:
+        raise ValueError(f"unknown field(s): {', '.join(sorted(unknown))}; choose from {', '.join(FIELDS)}")
+    if not names:
+        raise ValueError("no fields given")
+    return tuple(name for name in FIELDS if name in names)
+
+
+def needs_table_body(fields: Optional[tuple]) -> bool:
+    return fields is None or any(name in TABLE_FIELDS for name in fields)
+
+
+def amendment_to_json(a: Amendment, fields: Optional[tuple] = None) -> dict:
+    record = {
+        "id": a.id,
+        "authors": a.authors,
+        "section": a.section,
+        "content": a.content,
+        "amendment": a.amendment,
+        "warnings": a.warnings,
+    }
+    if fields is not None:
+        record = {name: value for name, value in record.items() if name in fields}
+    return record
+
+
+def amendments_to_json(amendments: list, fields: Optional[tuple] = None) -> list:
+    return [amendment_to_json(a, fields) for a in amendments]
+
+
+def write_json_array(amendments: Iterable[Amendment], f, indent: Optional[int] = 2,
+                     fields: Optional[tuple] = None) -> int:
+    """Write amendments to ``f`` as a JSON array, one element at a time.
+
+    The output is byte-identical to ``json.dump(amendments_to_json(...))`` with
+    the same ``indent``, but only one amendment is serialised at a time.
+    Returns the number of amendments written.
+    """
+    count = 0
+    for a in amendments:
+        text = json.dumps(amendment_to_json(a, fields), ensure_ascii=False, indent=indent)
+        if indent is None:
+            f.write(("[" if count == 0 else ", ") + text)
+        else:
+            pad = " " * indent
+            f.write(("[\n" if count == 0 else ",\n") + pad + text.replace("\n", "\n" + pad))
+        count += 1
+    if count == 0:
+        f.write("[]")
+    else:
+        f.write("]" if indent is None else "\n]")
+    return count
+
+
+def write_jsonl(amendments: Iterable[Amendment], f, fields: Optional[tuple] = None) -> int:
+    """Write one compact JSON object per line, flushing after each amendment."""
+    count = 0
+    for a in amendments:
+        f.write(json.dumps(amendment_to_json(a, fields), ensure_ascii=False) + "\n")
+        f.flush()
+        count += 1
+    return count
+
+
+def write_amendments(amendments: Iterable[Amendment], path: str, fmt: str = "json",
+                     indent: Optional[int] = 2, fields: Optional[tuple] = None) -> int:
+    """Write amendments to ``path`` (``-`` for stdout) as ``json`` or ``jsonl``.
+
+    ``fields`` restricts each record to those keys (see :func:`parse_fields`).
+    """
+    if path == "-":
+        count = _write_format(amendments, sys.stdout, fmt, indent, fields)
+        if fmt != "jsonl":
+            sys.stdout.write("\n")  # end the line after "]", as the scan output does
+        return count
+    with open(path, "w", encoding="utf-8") as f:
+        return _write_format(amendments, f, fmt, indent, fields)
+
+
+def _write_format(amendments: Iterable[Amendment], f, fmt: str, indent: Optional[int],
+                  fields: Optional[tuple] = None) -> int:
+    if fmt == "jsonl":
+        return write_jsonl(amendments, f, fields=fields)
+    return write_json_array(amendments, f, indent=indent, fields=fields)
+
+
+# ── library API ───────────────────────────────────────────────────────────────
+
+def parse_pdf(source: PdfSource, *, workers: int = 1, columnar: bool = False,
+              cache: Optional[SpanCache] = None, select: Optional[AmendmentFilter] = None,
+              header_only: bool = False, config: ParserConfig = DEFAULT_CONFIG,
+              calibrate_columns: bool = False, result_cache: Optional[ResultCache] = None,
+              fingerprint: Optional[str] = None) -> list:
+    """Parse a PDF (path or bytes) into a list of :class:`Amendment` records.
+
+    Holds no state between calls, so it is safe to call repeatedly from a
+    long-lived process.  ``header_only`` fills in ``id``, ``authors`` and
+    ``section`` only (see :func:`iter_amendments`).  ``config`` carries the
+    layout profile and the other tunables (see :class:`ParserConfig`);
+    ``calibrate_columns`` fits its column bands to the document first (see
+    :func:`calibrate`), remembering the result next to the span cache.
+
+    With a ``result_cache``, a document parsed before under the same config
+    is answered from the cache (filtered by ``select``) without opening it;
+    complete parses are stored.  Header-only calls bypass it.  The document
+    is hashed once for both caches; a caller that already has its
+    ``fingerprint`` (from :meth:`ResultCache.fingerprint`) can pass it in.
+    """
+    if result_cache is None or header_only:
+        return _parse_source(source, workers, columnar, cache, select, header_only, config, calibrate_columns,
+                             fingerprint)
+    fingerprint = fingerprint or result_cache.fingerprint(source)
+    key = result_cache.key(source, config, calibrate_columns, fingerprint)
+    amendments = result_cache.get(key)
+    if amendments is None:
+        amendments = _parse_source(source, workers, columnar, cache, None, False, config, calibrate_columns,
+                                   fingerprint)
+        result_cache.put(key, amendments)
+    return select.apply(amendments) if select is not None else amendments
+
+
+def _parse_source(source: PdfSource, workers: int, columnar: bool, cache: Optional[SpanCache],
+                  select: Optional[AmendmentFilter], header_only: bool, config: ParserConfig,
+                  calibrate_columns: bool, fingerprint: Optional[str] = None) -> list:
+    if (select is not None or header_only) and workers <= 1 and not columnar and not calibrate_columns:
+        # stream so extraction stops as soon as the filter is exhausted,
+        # and header-only runs can skip pages without headers
+        return list(iter_pdf_amendments(source, cache=cache, select=select, header_only=header_only,
+                                        config=config, fingerprint=fingerprint))
+    spans = load_spans(source, workers=workers, columnar=columnar, cache=cache, config=config,
+                       fingerprint=fingerprint)
+    if calibrate_columns:
+        config = calibrate(spans, config, cache.layouts() if cache is not None else None)
+    if columnar:
+        return parse_amendments(assemble_line_columns(spans, config), select=select,
+                                header_only=header_only, config=config)
+    lines = assemble_lines(spans, config)
+    if workers > 1 and select is None:
+        return parse_amendments_sharded(lines, workers, header_only=header_only, config=config)
+    return parse_amendments(lines, select=select, header_only=header_only, config=config)
+
+
+def iter_pdf_amendments(source: PdfSource, *, cache: Optional[SpanCache] = None,
+                        select: Optional[AmendmentFilter] = None,
+                        header_only: bool = False,
+                        config: ParserConfig = DEFAULT_CONFIG,
+                        fingerprint: Optional[str] = None) -> Iterator[Amendment]:
+    """Stream amendments from a PDF (path or bytes), page by page.
+
+    Equivalent to :func:`parse_pdf` but the first amendment is available as
+    soon as its pages are read, and memory stays constant with document size
+    (a span-cache hit decodes the cached entry up front instead).  On a cache
+    miss a full run writes the cache entry as the pages go by.  With an id
+    filter, extraction starts at the lowest requested amendment's header
+    page.  With ``header_only``, pages holding neither a header nor the rest
+    of a header block are not extracted at all.  ``fingerprint`` is as for
+    :func:`load_spans`.
+    """
+    if cache is not None:
+        key = cache.key(source, config, fingerprint)
+        spans = cache.load(key)
+        if spans is not None:
+            return iter_amendments(iter_lines(spans, config), select=select, header_only=header_only,
+                                   config=config)
+        if select is None and not header_only:
+            spans = _iter_spans_into_cache(source, cache, key, config)
+            return iter_amendments(iter_lines(spans, config), config=config)
+        # A filtered or header-only run reads only part of the document, so
+        # it cannot fill the cache.
+    return _iter_pdf_from_source(source, select, header_only, config)
+
+
+def _iter_spans_into_cache(source: PdfSource, cache: SpanCache, key: str,
+                           config: ParserConfig = DEFAULT_CONFIG) -> Iterator[Span]:
+    """:func:`iter_spans` over the whole document, storing it under ``key`` only if it is read to the end.
+
+    The entry's files are only created once the stream is started, so a
+    stream that is never read leaves nothing behind.
+    """
+    writer = None
+    try:
+        writer = cache.writer(key)
+        for s in iter_spans(source, config=config):
+            writer.add(s.x, s.y, s.size, s.page_num, s.bold, s.text)
+            yield s
+    except BaseException:  # includes GeneratorExit when the reader stops early
+        if writer is not None:
+            writer.discard()
+        raise
+    writer.commit()
+
+
+def _iter_pdf_from_source(source: PdfSource, select: Optional[AmendmentFilter],
+                          header_only: bool = False,
+                          config: ParserConfig = DEFAULT_CONFIG) -> Iterator[Amendment]:
+    doc = _open_pdf(source)
+    try:
+        start, prev_id_num = 0, 0
+        if select is not None and select.ids:
+            first = min(select.ids)
+            index = find_header_page(doc, first)
+            if index is not None:
+                start, prev_id_num = index, _previous_header(doc, index, first)
+        if header_only:
+            lines = _iter_header_lines(doc, start=start, config=config)
+        else:
+            lines = iter_lines(_iter_doc_spans(doc, start=start, config=config), config)
+        yield from iter_amendments(lines, prev_id_num=prev_id_num, select=select,
+                                   header_only=header_only, config=config)
+    finally:
+        doc.close()
+
+
+def _iter_header_lines(doc, start: int = 0, config: ParserConfig = DEFAULT_CONFIG) -> Iterator[Line]:
+    """Lines of the pages a header-only parse needs, skipping the rest.
+
+    A page is extracted if it holds an amendment header (see
+    :func:`page_headers`), or if the previous page ended inside a header
+    block (between the header and the first table row), e.g. when the
+    author list wraps onto the next page.
+    """
+    block_open = False
+    for index in range(start, doc.page_count):
+        page = doc[index]
+        if not block_open and not page_headers(page):
+            continue
+        lines = assemble_lines(_page_spans(page, index + 1, config), config)
+        block_open = _header_block_open(lines, block_open, config)
+        yield from lines
+
+
+def _header_block_open(lines: list, block_open: bool = False,
+                       config: ParserConfig = DEFAULT_CONFIG) -> bool:
+    """Whether a header block is still unfinished after ``lines``.
+
+    Mirrors the state machine: a block opens at an ``Amendment N`` header and
+    ends at the first line with text in the right-hand column.
+    """
+    for line in lines:
+        text = line_text(line)
+        if AMENDMENT_RE.match(text) and line_is_bold(line) and line_size(line) >= config.header_min_size:
+            block_open = True
+        elif block_open and any(span.x >= config.layout_for(line.page_num).column_split for span in line.spans):
+            block_open = False
+    return block_open
+
+
+# ── quick scan ────────────────────────────────────────────────────────────────
+#
+# Inventory of amendment numbers without span extraction.  Headers are first
+# looked for directly in the page content streams, where EP documents show them
+# as a literal "Amendment" string followed by the number in one TJ array; this
+# skips MuPDF's text layout entirely.  Pages without such a match (hex-encoded
+# fonts, kerned headers, continuation pages) fall back to a plain-text search,
+# so documents mixing encodings work and no header is missed.
+
+_CONTENT_HEADER_RE = re.compile(
+    rb'\[\s*\(Amendment(?:\)\s*-?[\d.]*\s*\(|\s+)(\d+)\)\s*\]\s*TJ'
+    rb'|\(Amendment\s+(\d+)\)\s*Tj'
+)
+
+
+@dataclass
+class ScanResult:
+    headers: list                 # (amendment number, page number) in document order
+    missing: list                 # numbers skipped between consecutive headers
+    out_of_order: list            # numbers not greater than their predecessor
+    method: str                   # "content-stream", "text", or "mixed" if pages needed both
+
+    def to_json(self) -> dict:
+        return {
+            "ids": [n for n, _ in self.headers],
+            "pages": [{"id": n, "page": page} for n, page in self.headers],
+            "missing": self.missing,
+            "out_of_order": self.out_of_order,
+            "method": self.method,
+        }
+
+
+def _content_headers(page, contents: Optional[bytes] = None) -> list:
+    """Amendment numbers shown as literal strings in the page content stream."""
+    if contents is None:
+        contents = page.read_contents()
+    return [int(m.group(1) or m.group(2)) for m in _CONTENT_HEADER_RE.finditer(contents)]
+
+
+def _text_headers(page) -> list:
+    """Amendment numbers found as whole lines of the page's plain text."""
+    numbers = []
+    for text in page.get_text("text", flags=0).splitlines():
+        m = AMENDMENT_RE.match(text.strip())
+        if m:
+            numbers.append(int(m.group(1)))
+    return numbers
+
+
+def page_headers(page) -> list:
+    """Amendment numbers whose headers are on ``page``, in content order.
+
+    Falls back to text extraction when the content stream has no literal
+    match, so a header shown any other way (hex strings, a kerned TJ array)
+    is still found.
+    """
+    return _page_headers(page)[0]
+
+
+def _page_headers(page) -> tuple:
+    """:func:`page_headers` plus whether the page needed the text fallback."""
+    contents = page.read_contents()
+    numbers = _content_headers(page, contents)
+    if numbers:
+        return numbers, False
+    return _text_headers(page), True
+
+
+def scan_amendments(source: PdfSource) -> ScanResult:
+    """List the amendment numbers in a document, the page of each header, and gaps.
+
+    Much cheaper than a full parse, but header detection is textual only (no
+    bold/size check), so treat the result as a triage aid.
+    """
+    doc = _open_pdf(source)
+    try:
+        headers = []
+        methods = set()
+        for page_num, page in enumerate(doc, start=1):
+            numbers, from_text = _page_headers(page)
+            if numbers:
+                methods.add("text" if from_text else "content-stream")
+            headers.extend((n, page_num) for n in numbers)
+    finally:
+        doc.close()
+    if not methods:
+        methods = {"text"}  # no header anywhere, and every page was searched as text
+    method = methods.pop() if len(methods) == 1 else "mixed"
+
+    missing, out_of_order = sequence_gaps([number for number, _ in headers])
+    return ScanResult(headers=headers, missing=missing, out_of_order=out_of_order, method=method)
+
+
+def sequence_gaps(numbers: list) -> tuple:
+    """Return (numbers skipped, numbers not greater than their predecessor)."""
+    missing = []
+    out_of_order = []
+    prev = None
+    for number in numbers:
+        if prev is not None:
+            if number <= prev:
+                out_of_order.append(number)
+                continue
+            missing.extend(range(prev + 1, number))
+        prev = number
+    return missing, out_of_order
+
+
+# ── random access ───────────────────────────────────────────────────────────────
+
+def find_header_page(doc, n: int) -> Optional[int]:
+    """Binary-search ``doc`` for the 0-based page holding the ``Amendment n`` header.
+
+    Relies on amendment numbers increasing through the document.  Pages
+    without a header (continuations) are skipped forward during the search.
+    """
+    known = {}
+
+    def headers(index: int) -> list:
+        if index not in known:
+            known[index] = page_headers(doc[index])
+        return known[index]
+
+    lo, hi = 0, doc.page_count - 1
+    while lo <= hi:
+        mid = (lo + hi) // 2
+        probe = mid
+        while probe <= hi and not headers(probe):
+            probe += 1
+        if probe > hi:
+            hi = mid - 1
+            continue
+        numbers = headers(probe)
+        if n in numbers:
+            return probe
+        if n < numbers[0]:
+            hi = mid - 1
+        elif n > numbers[-1]:
+            lo = probe + 1
+        else:
+            return None  # falls in a gap on this page
+    return None
+
+
+def _previous_header(doc, index: int, n: int) -> int:
+    """Number of the header preceding ``Amendment n`` on page ``index`` (0 if none)."""
+    numbers = page_headers(doc[index])
+    position = numbers.index(n)
+    if position > 0:
+        return numbers[position - 1]
+    for earlier in range(index - 1, -1, -1):
+        numbers = page_headers(doc[earlier])
+        if numbers:
+            return numbers[-1]
+    return 0
+
+
+def get_amendment(source: PdfSource, n: int, config: ParserConfig = DEFAULT_CONFIG) -> Optional[Amendment]:
+    """Parse only ``Amendment n``, or return None if the document does not contain it.
+
+    The header page is found by binary search; extraction then runs page by
+    page from there and stops as soon as the amendment's ``Or. xx`` marker
+    closes it.  The result is identical to the entry from a full parse.
+    """
+    doc = _open_pdf(source)
+    try:
+        index = find_header_page(doc, n)
+        if index is None:
+            return None
+        prev_id_num = _previous_header(doc, index, n)
+        lines = iter_lines(_iter_doc_spans(doc, start=index, config=config), config)
+        for a in iter_amendments(lines, prev_id_num=prev_id_num, config=config):
+            number = int(AMENDMENT_RE.match(a.id).group(1))
+            if number == n:
+                return a
+            if number > n:
+                break
+        return None
+    finally:
+        doc.close()
+
+
+class AmendmentDocument:
+    """Lazily parsed view of an amendments PDF, indexed by amendment number.
+
+    ``len()``, membership and ``numbers`` only need the cheap header scan.
+    ``doc[n]`` extracts and parses the pages from amendment ``n``'s header page
+    onward; extracted pages and parsed amendments are cached, so touching a
+    handful of amendments costs a handful of pages.  Accepts a path, raw bytes
+    or an already open ``fitz`` document (which is then not closed by us).
+    """
+
+    def __init__(self, source, config: ParserConfig = DEFAULT_CONFIG):
+        self.config = config
+        if isinstance(source, fitz.Document):
+            self._doc = source
+            self._owns_doc = False
+        else:
+            self._doc = _open_pdf(source)
+            self._owns_doc = True
+        self._headers = None
+        self._positions = {}
+        self._page_spans = {}
+        self._amendments = {}
+
+    def _scan(self) -> None:
+        if self._headers is None:
+            self._headers = [
+                (n, index) for index in range(self._doc.page_count) for n in page_headers(self._doc[index])
+            ]
+            for position, (n, _) in enumerate(self._headers):
+                self._positions.setdefault(n, position)
+
+    @property
+    def headers(self) -> list:
+        """(amendment number, 0-based page index) for every header, in document order."""
+        self._scan()
+        return self._headers
+
+    @property
+    def numbers(self) -> list:
+        return [n for n, _ in self.headers]
+
+    def __len__(self) -> int:
+        return len(self.headers)
+
+    def __contains__(self, n) -> bool:
+        self._scan()
+        return n in self._positions
+
+    def __iter__(self) -> Iterator[Amendment]:
+        for n in self.numbers:
+            yield self[n]
+
+    def __getitem__(self, n: int) -> Amendment:
+        if n in self._amendments:
+            return self._amendments[n]
+        if n not in self:
+            raise KeyError(n)
+
+        # Start at the first header on n's page so every amendment parsed on
+        # the way is complete and correctly sequenced, and can be cached.
+        page = self.headers[self._positions[n]][1]
+        first = self._positions[n]
+        while first > 0 and self.headers[first - 1][1] == page:
+            first -= 1
+        prev_id_num = self.headers[first - 1][0] if first else 0
+
+        lines = iter_lines(self._spans_from(page), self.config)
+        for a in iter_amendments(lines, prev_id_num=prev_id_num, config=self.config):
+            number = int(AMENDMENT_RE.match(a.id).group(1))
+            self._amendments.setdefault(number, a)
+            if number == n:
+                return a
+        raise KeyError(n)
+
+    def _spans_from(self, start: int) -> Iterator[Span]:
+        for index in range(start, self._doc.page_count):
+            if index not in self._page_spans:
+                self._page_spans[index] = _page_spans(self._doc[index], index + 1, self.config)
+            yield from self._page_spans[index]
+
+    def close(self) -> None:
+        if self._owns_doc:
+            self._doc.close()
+
+    def __enter__(self) -> "AmendmentDocument":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+# ── amendment index ─────────────────────────────────────────────────────────────
+#
+# A sidecar file recording where every amendment sits in its document, so later
+# requests for a few amendments only extract the pages that hold them.
+
+INDEX_VERSION = 1
+INDEX_SUFFIX = ".amidx.json"
+
+
+def index_path(pdf_path: str) -> str:
+    """Default sidecar location: next to the PDF."""
+    return str(pdf_path) + INDEX_SUFFIX
+
+
+@dataclass
+class AmendmentIndex:
+    sha256: str
+    page_count: int
+    entries: list  # (number, first_page, last_page, top_y, bottom_y) in document order
+
+    @classmethod
+    def from_amendments(cls, source: PdfSource, amendments: list) -> "AmendmentIndex":
+        entries = [
+            (int(AMENDMENT_RE.match(a.id).group(1)), a.first_page, a.last_page, a.top_y, a.bottom_y)
+            for a in amendments
+        ]
+        return cls(sha256=source_sha256(source), page_count=pdf_page_count(source), entries=entries)
+
+    def save(self, path: str) -> None:
+        data = {
+            "version": INDEX_VERSION,
+            "sha256": self.sha256,
+            "page_count": self.page_count,
+            "amendments": [list(e) for e in self.entries],
         }
-        for a in amendments
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f, separators=(",", ":"))
+
+    @classmethod
+    def load(cls, path: str) -> "AmendmentIndex":
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("version") != INDEX_VERSION:
+            raise ValueError(f"{path}: unsupported index version {data.get('version')!r}")
+        return cls(sha256=data["sha256"], page_count=data["page_count"],
+                   entries=[tuple(e) for e in data["amendments"]])
+
+
+def build_index(source: PdfSource, amendments: Optional[list] = None,
+                config: ParserConfig = DEFAULT_CONFIG) -> AmendmentIndex:
+    """Index ``amendments`` (parsing ``source`` first if they are not given)."""
+    if amendments is None:
+        amendments = parse_pdf(source, config=config)
+    return AmendmentIndex.from_amendments(source, amendments)
+
+
+def parse_indexed(source: PdfSource, numbers: Iterable[int], index: AmendmentIndex,
+                  verify: bool = True, config: ParserConfig = DEFAULT_CONFIG) -> list:
+    """Parse only the amendments numbered ``numbers``, extracting just their pages.
+
+    Results are in document order and identical to the same entries of a full
+    parse.  Numbers absent from the index are skipped.  With ``verify`` the
+    document hash is checked against the index first.
+    """
+    if verify and source_sha256(source) != index.sha256:
+        raise ValueError("amendment index does not match this document (content hash differs)")
+
+    wanted = set(numbers)
+    doc = _open_pdf(source)
+    page_spans = {}
+    results = []
+    try:
+        for position, (number, first_page, last_page, top_y, bottom_y) in enumerate(index.entries):
+            if number not in wanted:
+                continue
+            spans = []
+            for page_num in range(first_page, last_page + 1):
+                if page_num not in page_spans:
+                    page_spans[page_num] = _page_spans(doc[page_num - 1], page_num, config)
+                spans.extend(page_spans[page_num])
+            lines = [
+                line for line in iter_lines(spans, config)
+                if not (line.page_num == first_page and line.y < top_y - config.line_y_tolerance)
+                and not (line.page_num == last_page and line.y > bottom_y + config.line_y_tolerance)
+            ]
+            prev_id_num = index.entries[position - 1][0] if position else 0
+            results.extend(iter_amendments(lines, prev_id_num=prev_id_num, config=config))
+    finally:
+        doc.close()
+    return results
+
+
+# ── page-range shards ─────────────────────────────────────────────────────────
+#
+# One document split into page ranges that can be parsed on different machines.
+# A shard keeps its complete amendments plus two fragments: the lines before
+# its first header (the continuation of the previous shard's last amendment)
+# and, if its own last amendment is still open at the end of the range, that
+# amendment's lines.  Merging re-runs the state machine over each open tail
+# and the heads that follow it.  Lines never cross pages, so fragments are
+# stored as spans.
+
+SHARD_VERSION = 1
+
+
+def _spans_to_rows(spans: list) -> list:
+    return [[s.x, s.y, s.text, s.bold, s.size, s.page_num] for s in spans]
+
+
+def _rows_to_spans(rows: list) -> list:
+    return [Span(x=x, y=y, text=text, bold=bold, size=size, page_num=page_num)
+            for x, y, text, bold, size, page_num in rows]
+
+
+@dataclass
+class PageShard:
+    sha256: str
+    page_count: int
+    start: int                  # first page, 1-based
+    stop: int                   # last page, inclusive
+    headers: list               # amendment numbers of the headers in the range
+    head: list                  # spans before the first header
+    amendments: list            # amendments that close inside the range
+    tail: Optional[list] = None  # spans of the last amendment if still open at ``stop``
+
+    def to_json(self) -> dict:
+        return {
+            "version": SHARD_VERSION,
+            "sha256": self.sha256,
+            "page_count": self.page_count,
+            "pages": [self.start, self.stop],
+            "headers": self.headers,
+            "head": _spans_to_rows(self.head),
+            "amendments": [a.__dict__ for a in self.amendments],
+            "tail": None if self.tail is None else _spans_to_rows(self.tail),
+        }
+
+    @classmethod
+    def from_json(cls, data: dict) -> "PageShard":
+        if data.get("version") != SHARD_VERSION:
+            raise ValueError(f"unsupported shard version {data.get('version')!r}")
+        return cls(
+            sha256=data["sha256"], page_count=data["page_count"],
+            start=data["pages"][0], stop=data["pages"][1], headers=data["headers"],
+            head=_rows_to_spans(data["head"]),
+            amendments=[Amendment(**a) for a in data["amendments"]],
+            tail=None if data["tail"] is None else _rows_to_spans(data["tail"]),
+        )
+
+
+def parse_page_shard(source: PdfSource, start: int, stop: int,
+                     config: ParserConfig = DEFAULT_CONFIG) -> PageShard:
+    """Parse pages ``start``–``stop`` (1-based, inclusive) of ``source`` as one shard."""
+    page_count = pdf_page_count(source)
+    stop = min(stop, page_count)
+    spans = list(iter_spans(source, start - 1, stop, config))
+    lines = assemble_lines(spans, config)
+    positions = header_positions(lines, config)
+    shard = PageShard(sha256=source_sha256(source), page_count=page_count, start=start, stop=stop,
+                      headers=[n for _, n in positions], head=[], amendments=[])
+    if not positions:
+        shard.head = spans
+        return shard
+
+    first, last = positions[0][0], positions[-1][0]
+    shard.head = [s for line in lines[:first] for s in line.spans]
+    shard.amendments = parse_amendments(lines[first:], config=config)
+    if not any(LANGUAGE_MARKER_RE.match(line_text(line)) for line in lines[last + 1:]):
+        # the last amendment only ended because the range did
+        shard.amendments.pop()
+        shard.tail = [s for line in lines[last:] for s in line.spans]
+    return shard
+
+
+def merge_page_shards(shards: list, config: ParserConfig = DEFAULT_CONFIG) -> list:
+    """Stitch shards covering a whole document back into the serial parser's output."""
+    shards = sorted(shards, key=lambda shard: shard.start)
+    if not shards:
+        return []
+    expected = 1
+    for shard in shards:
+        if shard.sha256 != shards[0].sha256:
+            raise ValueError("shards come from different documents")
+        if shard.start != expected:
+            raise ValueError(f"shards do not cover page {expected}")
+        expected = shard.stop + 1
+    if expected != shards[0].page_count + 1:
+        raise ValueError(f"shards end at page {expected - 1} of {shards[0].page_count}")
+
+    results = []
+    prev_header = 0   # number of the last header before the current shard
+    open_spans = None  # spans of an amendment still open at a shard edge
+    open_prev = 0      # number of the header before the open amendment
+    for shard in shards:
+        if open_spans is not None:
+            open_spans.extend(shard.head)
+            if not shard.headers:
+                continue  # the open amendment spans this whole shard
+            results.extend(iter_amendments(iter_lines(open_spans, config), prev_id_num=open_prev, config=config))
+            open_spans = None
+        amendments = shard.amendments
+        if amendments and prev_header and shard.headers[0] != prev_header + 1:
+            # the shard was parsed without knowing its predecessor; copy rather than edit the caller's shard
+            first = amendments[0]
+            warning = f"non_sequential_id: expected {prev_header + 1}, got {shard.headers[0]}"
+            amendments = [replace(first, warnings=[warning, *first.warnings]), *amendments[1:]]
+        results.extend(amendments)
+        if shard.tail is not None:
+            open_spans = list(shard.tail)
+            open_prev = shard.headers[-2] if len(shard.headers) > 1 else prev_header
+        if shard.headers:
+            prev_header = shard.headers[-1]
+    if open_spans is not None:
+        results.extend(iter_amendments(iter_lines(open_spans, config), prev_id_num=open_prev, config=config))
+    return results
+
+
+# ── metrics ───────────────────────────────────────────────────────────────────
+
+def _cpu_seconds() -> float:
+    """CPU time of this process plus any child processes it has reaped."""
+    t = os.times()
+    return t.user + t.system + t.children_user + t.children_system
+
+
+class PhaseTimer:
+    """Record wall-clock and CPU time per named phase."""
+
+    def __init__(self):
+        self.phases = {}
+
+    @contextmanager
+    def phase(self, name: str):
+        wall_start = time.perf_counter()
+        cpu_start = _cpu_seconds()
+        try:
+            yield
+        finally:
+            self.phases[name] = {
+                "wall_s": time.perf_counter() - wall_start,
+                "cpu_s": _cpu_seconds() - cpu_start,
+            }
+
+
+def _rate(count: int, seconds: float) -> Optional[float]:
+    return count / seconds if seconds > 0 else None
+
+
+def build_metrics(source: str, timer: PhaseTimer, page_count: int, span_count: int,
+                  line_count: int, amendment_count: int, page_stats: list,
+                  slowest: int = 10) -> dict:
+    """Assemble the ``--metrics`` report from phase timings and per-page costs.
+
+    Pages and spans per second are measured against span extraction, lines
+    per second against the state machine.  When spans came from the cache,
+    ``pages`` is empty and the extraction rates are None: the phase then
+    timed a cache load, not PyMuPDF.
+    """
+    extraction = timer.phases.get("span_extraction", {}).get("wall_s", 0.0)
+    state_machine = timer.phases.get("state_machine", {}).get("wall_s", 0.0)
+    pages = [
+        {"page": page_num, "wall_s": seconds, "spans": spans}
+        for page_num, seconds, spans in sorted(page_stats)
+    ]
+    cache_hit = not page_stats and page_count > 0
+    return {
+        "source": source,
+        "cache_hit": cache_hit,
+        "counts": {
+            "pages": page_count,
+            "spans": span_count,
+            "lines": line_count,
+            "amendments": amendment_count,
+        },
+        "phases": timer.phases,
+        "total": {
+            "wall_s": sum(p["wall_s"] for p in timer.phases.values()),
+            "cpu_s": sum(p["cpu_s"] for p in timer.phases.values()),
+        },
+        "throughput": {
+            "pages_per_s": None if cache_hit else _rate(page_count, extraction),
+            "spans_per_s": None if cache_hit else _rate(span_count, extraction),
+            "lines_per_s": _rate(line_count, state_machine),
+        },
+        "slowest_pages": sorted(pages, key=lambda p: p["wall_s"], reverse=True)[:slowest],
+        "pages": pages,
+    }
+
+
+def pdf_page_count(source: PdfSource) -> int:
+    doc = _open_pdf(source)
+    try:
+        return doc.page_count
+    finally:
+        doc.close()
+
+
+# ── batch mode ────────────────────────────────────────────────────────────────
+
+@dataclass
+class BatchResult:
+    source: str
+    output: str
+    amendments: int = 0
+    with_warnings: int = 0
+    seconds: float = 0.0
+    error: Optional[str] = None
+    fingerprint: Optional[str] = None   # see source_fingerprint
+    skipped: bool = False           # already done according to the checkpoint (--resume)
+
+
+def batch_sources(pattern: str) -> list:
+    """Expand a directory or (recursive) glob pattern into a sorted list of PDF paths."""
+    if os.path.isdir(pattern):
+        pattern = os.path.join(pattern, "**", "*.pdf")
+    return sorted(p for p in glob.glob(pattern, recursive=True) if os.path.isfile(p))
+
+
+def batch_output_paths(sources: list, out_dir: str, suffix: str = ".json") -> list:
+    """Map each source to ``out_dir``, mirroring its path below the common parent directory."""
+    if not sources:
+        return []
+    base = os.path.commonpath([os.path.dirname(os.path.abspath(p)) for p in sources])
+    return [
+        os.path.join(out_dir, os.path.splitext(os.path.relpath(os.path.abspath(p), base))[0] + suffix)
+        for p in sources
     ]
 
 
+def _parse_to_file(source: str, output: str, cache: Optional[SpanCache],
+                   indent: Optional[int], fmt: str, fields: Optional[tuple] = None,
+                   config: ParserConfig = DEFAULT_CONFIG, calibrate_columns: bool = False,
+                   result_cache: Optional[ResultCache] = None, fast_fingerprint: bool = False) -> BatchResult:
+    """Parse one document and write its JSON; failures are captured, not raised.
+
+    The document is hashed once; the fingerprint keys both caches and goes
+    into the checkpoint.
+    """
+    result = BatchResult(source=source, output=output)
+    started = time.perf_counter()
+    try:
+        result.fingerprint = source_fingerprint(source, fast=fast_fingerprint)
+        amendments = parse_pdf(source, cache=cache, header_only=not needs_table_body(fields), config=config,
+                               calibrate_columns=calibrate_columns, result_cache=result_cache,
+                               fingerprint=result.fingerprint)
+        os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+        # Written aside and renamed, so a reader (or a node redoing an expired job) never sees half a file.
+        tmp_path = f"{output}.{worker_id()}.tmp"
+        write_amendments(amendments, tmp_path, fmt=fmt, indent=indent, fields=fields)
+        os.replace(tmp_path, output)
+        result.amendments = len(amendments)
+        result.with_warnings = sum(1 for a in amendments if a.warnings)
+    except Exception as exc:
+        result.error = f"{type(exc).__name__}: {exc}"
+    result.seconds = time.perf_counter() - started
+    return result
+
+
+def iter_batch(sources: list, out_dir: str, workers: int = 1, cache: Optional[SpanCache] = None,
+               indent: Optional[int] = 2, fmt: str = "json",
+               fields: Optional[tuple] = None,
+               config: ParserConfig = DEFAULT_CONFIG,
+               calibrate_columns: bool = False,
+               result_cache: Optional[ResultCache] = None,
+               checkpoint: Optional["BatchCheckpoint"] = None,
+               resume: bool = False, fast_fingerprint: bool = False) -> Iterator[BatchResult]:
+    """Parse many documents, yielding each :class:`BatchResult` as soon as it completes.
+
+    Documents are fanned out over a process pool; every worker imports this
+    module (and PyMuPDF) once and is reused for the rest of the batch.
+
+    Every result is appended to ``checkpoint`` if one is given.  With
+    ``resume``, documents the checkpoint already records as done under the
+    same parser version and settings are yielded as ``skipped`` instead.
+    ``fast_fingerprint`` must match the ``result_cache`` (see
+    :func:`source_fingerprint`).
+    """
+    jobs = list(zip(sources, batch_output_paths(sources, out_dir, suffix="." + fmt)))
+    key = None
+    if checkpoint is not None:
+        key = config_hash(config, indent=indent, fmt=fmt, fields=fields,
+                                calibrate_columns=calibrate_columns)
+        pending = []
+        for source, output in jobs:
+            if resume and checkpoint.is_current(source, output, key):
+                yield BatchResult(source=source, output=output, skipped=True)
+            else:
+                pending.append((source, output, checkpoint.stat(source)))
+        jobs = [(source, output) for source, output, _ in pending]
+        stats = {source: stat for source, _, stat in pending}
+
+    def finished(result: BatchResult) -> BatchResult:
+        if checkpoint is not None:
+            checkpoint.record(result, key, stats[result.source])
+        return result
+
+    if workers <= 1:
+        for source, output in jobs:
+            yield finished(_parse_to_file(source, output, cache, indent, fmt, fields, config, calibrate_columns,
+                                          result_cache, fast_fingerprint))
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(_parse_to_file, source, output, cache, indent, fmt, fields, config,
+                               calibrate_columns, result_cache, fast_fingerprint)
+                   for source, output in jobs]
+        for future in as_completed(futures):
+            yield finished(future.result())
+
+
+# ── batch checkpoints ─────────────────────────────────────────────────────────
+#
+# An append-only JSON Lines file with one record per finished document.  A
+# crash loses at most the line being written, which is skipped on load; for
+# a source recorded more than once the last record wins.
+
+CHECKPOINT_NAME = "checkpoint.jsonl"
+
+
+class BatchCheckpoint:
+    """Per-document status of a batch run, for ``--resume``."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.records = {}
+        try:
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:  # torn final line after a crash
+                        continue
+                    self.records[record["path"]] = record
+        except FileNotFoundError:
+            pass
+
+    @staticmethod
+    def stat(source: str) -> Optional[tuple]:
+        """``(size, mtime_ns)``, used to skip re-hashing files that have not been touched."""
+        try:
+            st = os.stat(source)
+        except OSError:
+            return None
+        return st.st_size, st.st_mtime_ns
+
+    def is_current(self, source: str, output: str, config_hash: str) -> bool:
+        """True if ``source`` was parsed without error into ``output`` under the same key."""
+        record = self.records.get(os.path.abspath(source))
+        if (record is None or record["error"] or record["parser_version"] != parser_version()
+                or record["config_hash"] != config_hash or record["output"] != output
+                or not os.path.exists(output)):
+            return False
+        stat = self.stat(source)
+        if stat is None:
+            return False
+        if stat == (record["size"], record["mtime_ns"]):
+            return True
+        fingerprint = record.get("fingerprint")
+        return fingerprint is not None and source_fingerprint(source, fast=fingerprint.startswith("fast:")) == fingerprint
+
+    def record(self, result: BatchResult, config_hash: str, stat: Optional[tuple]) -> None:
+        """Append ``result``; ``stat`` is the source's :meth:`stat` from before it was parsed."""
+        record = {
+            "path": os.path.abspath(result.source),
+            "source": result.source,
+            "fingerprint": result.fingerprint,
+            "size": stat[0] if stat else None,
+            "mtime_ns": stat[1] if stat else None,
+            "parser_version": parser_version(),
+            "config_hash": config_hash,
+            "output": result.output,
+            "amendments": result.amendments,
+            "seconds": round(result.seconds, 3),
+            "error": result.error,
+            "finished": time.time(),
+        }
+        self.records[record["path"]] = record
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+
+# ── shared work queue ─────────────────────────────────────────────────────────
+#
+# Several nodes mounting the same storage run the same --batch command with
+# --queue pointing at a shared directory.  A node claims a document by
+# creating its lock file with O_EXCL, keeps the claim alive by touching the
+# lock (heartbeat), and on success writes a done record and removes the lock.
+# A lock whose mtime is older than the lease belongs to a crashed node and is
+# taken over.  Node clocks must agree to well within the lease.
+#
+#   <queue>/locks/<key>.lock    {"worker", "source", "claimed"}
+#   <queue>/done/<key>.json     BatchResult fields plus worker and finish time
+
+DEFAULT_LEASE_SECONDS = 120
+
+
+def worker_id() -> str:
+    """``host.pid``: unique across nodes sharing a queue directory."""
+    return f"{socket.gethostname()}.{os.getpid()}"
+
+
+def _write_json_atomic(path: str, data) -> None:
+    tmp_path = f"{path}.{worker_id()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+
+
+class WorkQueue:
+    """Directory-based job claims with leases, safe across processes and hosts."""
+
+    def __init__(self, directory: str, lease_seconds: float = DEFAULT_LEASE_SECONDS,
+                 worker: Optional[str] = None):
+        self.directory = directory
+        self.lease_seconds = lease_seconds
+        self.worker = worker or worker_id()
+        self._held = set()
+        self._held_lock = threading.Lock()
+        os.makedirs(os.path.join(directory, "locks"), exist_ok=True)
+        os.makedirs(os.path.join(directory, "done"), exist_ok=True)
+
+    @staticmethod
+    def job_key(name: str) -> str:
+        """Stable file name for a job, given its output path relative to the output directory."""
+        return hashlib.sha256(name.replace(os.sep, "/").encode()).hexdigest()[:32]
+
+    def _lock_path(self, key: str) -> str:
+        return os.path.join(self.directory, "locks", key + ".lock")
+
+    def _done_path(self, key: str) -> str:
+        return os.path.join(self.directory, "done", key + ".json")
+
+    def is_done(self, key: str) -> bool:
+        return os.path.exists(self._done_path(key))
+
+    def claim(self, key: str, source: str) -> bool:
+        """Take the job unless it is done or another worker holds a live lease."""
+        path = self._lock_path(key)
+        for _ in range(2):
+            if self.is_done(key):
+                return False
+            try:
+                fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            except FileExistsError:
+                if not self._take_over(path):
+                    return False
+                continue
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump({"worker": self.worker, "source": source, "claimed": time.time()}, f)
+            with self._held_lock:
+                self._held.add(key)
+            return True
+        return False
+
+    def _take_over(self, path: str) -> bool:
+        """Remove ``path`` if its lease has expired; True if the job may be claimed again."""
+        try:
+            if time.time() - os.stat(path).st_mtime < self.lease_seconds:
+                return False
+        except FileNotFoundError:
+            return True
+        # Renaming is atomic, so of several nodes seeing the same stale lock only one moves it.
+        stale = f"{path}.{self.worker}.stale"
+        try:
+            os.rename(path, stale)
+        except FileNotFoundError:
+            return True
+        try:
+            if time.time() - os.stat(stale).st_mtime < self.lease_seconds:
+                # Another node took it over between our stat and rename: put its lock back.
+                try:
+                    os.link(stale, path)
+                except FileExistsError:
+                    pass
+                return False
+        finally:
+            os.remove(stale)
+        return True
+
+    def owns(self, key: str) -> bool:
+        try:
+            with open(self._lock_path(key), encoding="utf-8") as f:
+                return json.load(f).get("worker") == self.worker
+        except (FileNotFoundError, ValueError):
+            return False
+
+    def heartbeat(self) -> None:
+        """Renew the lease on every job this worker holds."""
+        with self._held_lock:
+            held = list(self._held)
+        for key in held:
+            try:
+                os.utime(self._lock_path(key))
+            except FileNotFoundError:
+                pass
+
+    @contextmanager
+    def heartbeats(self):
+        """Renew held leases from a background thread, three times per lease period."""
+        stop = threading.Event()
+
+        def beat():
+            while not stop.wait(self.lease_seconds / 3):
+                self.heartbeat()
+
+        thread = threading.Thread(target=beat, name="ep-parser-heartbeat", daemon=True)
+        thread.start()
+        try:
+            yield self
+        finally:
+            stop.set()
+            thread.join()
+
+    def complete(self, key: str, result: BatchResult) -> bool:
+        """Record ``result`` and drop the lock; False if the lease was lost to another worker."""
+        with self._held_lock:
+            self._held.discard(key)
+        if not self.owns(key):
+            return False
+        _write_json_atomic(self._done_path(key), {**asdict(result), "worker": self.worker,
+                                                  "finished": time.time()})
+        try:
+            os.remove(self._lock_path(key))
+        except FileNotFoundError:
+            pass
+        return True
+
+    def records(self) -> list:
+        """Done records of every job in the queue, sorted by source."""
+        records = []
+        for entry in os.scandir(os.path.join(self.directory, "done")):
+            if entry.name.endswith(".json"):
+                with open(entry.path, encoding="utf-8") as f:
+                    records.append(json.load(f))
+        return sorted(records, key=lambda r: r["source"])
+
+
+def iter_queue(sources: list, out_dir: str, queue: WorkQueue, workers: int = 1,
+               cache: Optional[SpanCache] = None, indent: Optional[int] = 2, fmt: str = "json",
+               fields: Optional[tuple] = None, config: ParserConfig = DEFAULT_CONFIG,
+               calibrate_columns: bool = False,
+               result_cache: Optional[ResultCache] = None,
+               fast_fingerprint: bool = False) -> Iterator[BatchResult]:
+    """Parse the documents of ``sources`` this node manages to claim from ``queue``.
+
+    Jobs held by other nodes are revisited until they are done, so a node
+    only returns once the whole batch is finished, having picked up the
+    work of any node whose lease expired.
+    """
+    outputs = batch_output_paths(sources, out_dir, suffix="." + fmt)
+    jobs = [(WorkQueue.job_key(os.path.relpath(output, out_dir)), source, output)
+            for source, output in zip(sources, outputs)]
+    args = (cache, indent, fmt, fields, config, calibrate_columns, result_cache, fast_fingerprint)
+    pool = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    with queue.heartbeats():
+        try:
+            while jobs:
+                deferred = []
+                running = {}
+                pending = iter(jobs)
+                while True:
+                    # Claim until every worker slot is busy (one slot when serial).
+                    while len(running) < max(workers, 1):
+                        job = next(pending, None)
+                        if job is None:
+                            break
+                        key, source, output = job
+                        if queue.claim(key, source):
+                            if pool is None:
+                                running[key] = _parse_to_file(source, output, *args)
+                            else:
+                                running[key] = pool.submit(_parse_to_file, source, output, *args)
+                        elif not queue.is_done(key):
+                            deferred.append(job)
+                    if not running:
+                        break
+                    if pool is None:
+                        done = list(running)
+                    else:
+                        wait(running.values(), return_when=FIRST_COMPLETED)
+                        done = [key for key, future in running.items() if future.done()]
+                    for key in done:
+                        result = running.pop(key)
+                        if pool is not None:
+                            result = result.result()
+                        if queue.complete(key, result):
+                            yield result
+                jobs = deferred
+                if jobs:
+                    time.sleep(min(queue.lease_seconds / 4, 5))
+        finally:
+            if pool is not None:
+                pool.shutdown()
+
+
+def write_queue_manifest(queue: WorkQueue, path: str) -> list:
+    """Write the done records of ``queue`` as one JSON array at ``path``."""
+    records = queue.records()
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    _write_json_atomic(path, records)
+    return records
+
+
 # ── main ──────────────────────────────────────────────────────────────────────
 
-def main():
-    parser = argparse.ArgumentParser(description="Parse EP amendments PDF to JSON")
-    parser.add_argument("pdf", help="Input PDF file")
-    parser.add_argument("-o", "--output", default="amendments.json", help="Output JSON file")
-    parser.add_argument("--pretty", action="store_true", default=True, help="Pretty-print JSON")
-    args = parser.parse_args()
+def _run_batch(args, cache: Optional[SpanCache], result_cache: Optional[ResultCache]) -> int:
+    sources = batch_sources(args.batch)
+    print(f"Parsing {len(sources)} documents with {args.workers} worker(s) …", file=sys.stderr)
+    options = dict(workers=args.workers, cache=cache, indent=2 if args.pretty else None, fmt=args.format,
+                   fields=args.fields, config=args.config, calibrate_columns=args.calibrate,
+                   result_cache=result_cache, fast_fingerprint=args.fast_fingerprint)
+    queue = None
+    if args.queue:
+        queue = WorkQueue(args.queue, lease_seconds=args.lease)
+        print(f"  sharing {args.queue} as worker {queue.worker}", file=sys.stderr)
+        results = iter_queue(sources, args.out_dir, queue, **options)
+    else:
+        checkpoint = BatchCheckpoint(os.path.join(args.out_dir, CHECKPOINT_NAME))
+        results = iter_batch(sources, args.out_dir, checkpoint=checkpoint, resume=args.resume, **options)
+    succeeded = failures = skipped = 0
+    for result in results:
+        if result.skipped:
+            skipped += 1
+        elif result.error:
+            failures += 1
+            print(f"  FAILED {result.source}: {result.error}", file=sys.stderr)
+        else:
+            print(
+                f"  {result.source} → {result.output}: {result.amendments} amendments, "
+                f"{result.with_warnings} with warnings ({result.seconds:.2f}s)",
+                file=sys.stderr,
+            )
+            succeeded += 1
+    if skipped:
+        print(f"Skipped {skipped} documents already done (--resume)", file=sys.stderr)
+    print(f"Done: {succeeded} succeeded, {failures} failed", file=sys.stderr)
+    if queue is not None:
+        manifest = os.path.join(args.out_dir, "manifest.json")
+        records = write_queue_manifest(queue, manifest)
+        print(f"Queue complete: {len(records)} documents recorded in {manifest}", file=sys.stderr)
+    return 1 if failures else 0
+
+
+def _run_shard(args) -> int:
+    start, stop = args.shard
+    print(f"Parsing pages {start}–{stop} of {args.pdf} as a shard …", file=sys.stderr)
+    shard = parse_page_shard(args.pdf, start, stop, args.config)
+    data = json.dumps(shard.to_json(), ensure_ascii=False, separators=(",", ":"))
+    if args.output == "-":
+        sys.stdout.write(data + "\n")
+    else:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(data)
+    print(f"  {len(shard.amendments)} complete amendments, open head: {bool(shard.head)}, "
+          f"open tail: {shard.tail is not None}", file=sys.stderr)
+    print(f"Written to {args.output}", file=sys.stderr)
+    return 0
+
+
+def _run_merge(args) -> int:
+    shards = []
+    for path in args.merge:
+        with open(path, encoding="utf-8") as f:
+            shards.append(PageShard.from_json(json.load(f)))
+    amendments = merge_page_shards(shards, args.config)
+    write_amendments(amendments, args.output, fmt=args.format, indent=2 if args.pretty else None,
+                     fields=args.fields)
+    print(f"Merged {len(shards)} shards: {len(amendments)} amendments written to {args.output}", file=sys.stderr)
+    return 0
+
+
+def _page_span_arg(spec: str) -> tuple:
+    """``"101-200"`` → ``(101, 200)``: 1-based, inclusive."""
+    low, sep, high = spec.partition("-")
+    start, stop = int(low), int(high) if sep else int(low)
+    if not 1 <= start <= stop:
+        raise ValueError(spec)
+    return start, stop
+
+
+def _run_scan(args) -> int:
+    print(f"Scanning {args.pdf} for amendment headers …", file=sys.stderr)
+    result = scan_amendments(args.pdf)
+    data = result.to_json()
+    if args.output == "-":
+        json.dump(data, sys.stdout, indent=2)
+        sys.stdout.write("\n")
+    else:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2)
+    ids = data["ids"]
+    span = f" ({ids[0]}–{ids[-1]})" if ids else ""
+    print(f"  {len(ids)} amendment headers{span}, {len(result.missing)} missing, "
+          f"{len(result.out_of_order)} out of order", file=sys.stderr)
+    print(f"Written to {args.output}", file=sys.stderr)
+    return 0
+
+
+def _run_stream(args, cache: Optional[SpanCache], select: Optional[AmendmentFilter],
+                result_cache: Optional[ResultCache]) -> int:
+    """Write each amendment as soon as the parser closes it (JSON Lines or filtered runs)."""
+    print(f"Streaming amendments from {args.pdf} …", file=sys.stderr)
+    header_only = not needs_table_body(args.fields)
+    # a complete run fills the result cache as it writes, without holding the document
+    writer = None
+    if result_cache is not None and select is None and not header_only:
+        writer = result_cache.writer(args.result_key)
+    warnings_count = 0
+
+    def counted(amendments):
+        nonlocal warnings_count
+        for a in amendments:
+            warnings_count += bool(a.warnings)
+            if writer is not None:
+                writer.add(a)
+            yield a
+
+    amendments = iter_pdf_amendments(args.pdf, cache=cache, select=select, header_only=header_only,
+                                     config=args.config, fingerprint=args.fingerprint)
+    try:
+        count = write_amendments(counted(amendments), args.output, fmt=args.format,
+                                 indent=2 if args.pretty else None, fields=args.fields)
+    except BaseException:
+        if writer is not None:
+            writer.discard()
+        raise
+    if writer is not None:
+        writer.commit()
+    print(f"  {count} amendments written to {args.output}", file=sys.stderr)
+    print(f"Amendments with warnings: {warnings_count}", file=sys.stderr)
+    return 0
+
+
+def _run_cached(args, amendments: list, select: Optional[AmendmentFilter]) -> int:
+    """Write a result found in the result cache; the PDF is not opened."""
+    print(f"Using the cached result for {args.pdf}", file=sys.stderr)
+    if select is not None:
+        amendments = select.apply(amendments)
+    count = write_amendments(amendments, args.output, fmt=args.format, indent=2 if args.pretty else None,
+                             fields=args.fields)
+    print(f"  {count} amendments written to {args.output}", file=sys.stderr)
+    if args.index is not None:
+        path = args.index or index_path(args.pdf)
+        build_index(args.pdf, amendments).save(path)
+        print(f"Index written to {path}", file=sys.stderr)
+    return 0
+
+
+def _run_single(args, cache: Optional[SpanCache], select: Optional[AmendmentFilter],
+                result_cache: Optional[ResultCache]) -> int:
+    timer = PhaseTimer()
+    page_stats = []
 
     print(f"Extracting spans from {args.pdf} …", file=sys.stderr)
-    spans = extract_spans(args.pdf)
+    with timer.phase("span_extraction"):
+        spans = load_spans(args.pdf, workers=args.workers, columnar=args.columnar,
+                           cache=cache, page_stats=page_stats, config=args.config,
+                           fingerprint=args.fingerprint)
     print(f"  {len(spans)} spans extracted", file=sys.stderr)
 
+    config = args.config
+    if args.calibrate:
+        with timer.phase("calibration"):
+            config = calibrate(spans, config, cache.layouts() if cache is not None else None)
+        split = ", ".join(f"p{n}: {page.column_split}" for n, page in config.page_layouts)
+        print(f"  column split at x={config.layout.column_split}" + (f" ({split})" if split else ""),
+              file=sys.stderr)
+
     print("Assembling lines …", file=sys.stderr)
-    lines = assemble_lines(spans)
+    with timer.phase("line_assembly"):
+        assemble = assemble_line_columns if args.columnar else assemble_lines
+        lines = assemble(spans, config)
     print(f"  {len(lines)} logical lines assembled", file=sys.stderr)
 
     print("Parsing amendments …", file=sys.stderr)
-    amendments = parse_amendments(lines)
+    with timer.phase("state_machine"):
+        header_only = not needs_table_body(args.fields)
+        if args.workers > 1 and select is None and not args.columnar:
+            amendments = parse_amendments_sharded(lines, args.workers, header_only=header_only, config=config)
+        else:
+            amendments = parse_amendments(lines, select=select, header_only=header_only, config=config)
     print(f"  {len(amendments)} amendments parsed", file=sys.stderr)
+    if result_cache is not None and select is None and not header_only:
+        result_cache.put(args.result_key, amendments)
 
-    data = amendments_to_json(amendments)
-    indent = 2 if args.pretty else None
-    with open(args.output, "w", encoding="utf-8") as f:
-        json.dump(data, f, ensure_ascii=False, indent=indent)
+    with timer.phase("serialisation"):
+        write_amendments(amendments, args.output, fmt=args.format, indent=2 if args.pretty else None,
+                         fields=args.fields)
     print(f"Written to {args.output}", file=sys.stderr)
 
     warnings_count = sum(1 for a in amendments if a.warnings)
     print(f"Amendments with warnings: {warnings_count}", file=sys.stderr)
 
+    if args.index is not None:
+        path = args.index or index_path(args.pdf)
+        build_index(args.pdf, amendments).save(path)
+        print(f"Index written to {path}", file=sys.stderr)
+
+    if args.metrics:
+        metrics = build_metrics(args.pdf, timer, pdf_page_count(args.pdf), len(spans), len(lines),
+                                len(amendments), page_stats)
+        with open(args.metrics, "w", encoding="utf-8") as f:
+            json.dump(metrics, f, indent=2)
+        print(f"Metrics written to {args.metrics}", file=sys.stderr)
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Parse EP amendments PDF to JSON")
+    parser.add_argument("pdf", nargs="?", help="Input PDF file")
+    parser.add_argument("-o", "--output", default="amendments.json", help="Output JSON file ('-' for stdout)")
+    parser.add_argument("--format", choices=("json", "jsonl"), default="json",
+                        help="JSON array (default) or JSON Lines, written and flushed one amendment at a time")
+    parser.add_argument("--pretty", action="store_true", default=True, help="Pretty-print JSON")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Parallel processes: page ranges and amendment shards of one PDF, "
+                             "or documents in --batch mode (default: 1)")
+    parser.add_argument("--layout", type=load_layout, default=DEFAULT_LAYOUT, metavar="NAME|FILE",
+                        help=f"Page layout profile ({', '.join(LAYOUTS)}) or a JSON file of "
+                             f"LayoutProfile fields (default: {DEFAULT_LAYOUT.name})")
+    parser.add_argument("--calibrate", action="store_true",
+                        help="Fit the column split to this document's column edges (and odd pages separately)")
+    parser.add_argument("--columnar", action="store_true",
+                        help="Use the NumPy columnar span store (requires numpy)")
+    parser.add_argument("--cache-dir", default=None,
+                        help="Directory for cached span extraction (default: ~/.cache/ep-parser/spans)")
+    parser.add_argument("--cache-size", type=int, default=DEFAULT_CACHE_MAX_BYTES // (1024 * 1024),
+                        help="Span cache size cap in MB (default: 512)")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Do not read or write the span and result caches")
+    parser.add_argument("--result-cache-size", type=int, default=DEFAULT_RESULT_CACHE_MAX_BYTES // (1024 * 1024),
+                        metavar="MB", help="Cap of the cache of complete results, which answers repeated "
+                                           "documents without parsing (default: 256, 0 disables it)")
+    parser.add_argument("--fast-fingerprint", action="store_true",
+                        help="Key the result cache on the file size and sampled chunks instead of a full "
+                             "SHA-256 (for large, trusted files)")
+    parser.add_argument("--metrics", metavar="FILE",
+                        help="Write per-phase wall/CPU times, throughput and per-page costs as JSON")
+    parser.add_argument("--index", nargs="?", const="", metavar="FILE",
+                        help="Also write an amendment-to-page index (default: <pdf>.amidx.json)")
+    parser.add_argument("--fields", type=parse_fields, metavar="LIST",
+                        help="Only output these fields, e.g. id,authors,section (without content, "
+                             "amendment and warnings the table text is never parsed)")
+    parser.add_argument("--author", help="Only amendments whose authors contain this text (whole words)")
+    parser.add_argument("--section", help="Only amendments whose section contains this text (whole words)")
+    parser.add_argument("--ids", type=parse_id_ranges, metavar="SPEC",
+                        help="Only these amendment numbers, e.g. 100-150 or 1,5,7-9")
+    parser.add_argument("--limit", type=int, help="Stop after this many (matching) amendments")
+    parser.add_argument("--scan", action="store_true",
+                        help="Only list amendment numbers, header pages and gaps (fast, no full parse)")
+    parser.add_argument("--batch", metavar="GLOB",
+                        help="Parse every PDF matching GLOB (or below a directory) instead of a single file")
+    parser.add_argument("--out-dir", default="results", help="Output directory for --batch (default: results)")
+    parser.add_argument("--resume", action="store_true",
+                        help="In --batch mode, skip documents the out-dir checkpoint records as done "
+                             "with the same parser version and settings")
+    parser.add_argument("--queue", metavar="DIR",
+                        help="Share --batch work with other nodes through this directory on a shared mount")
+    parser.add_argument("--lease", type=float, default=DEFAULT_LEASE_SECONDS, metavar="SECONDS",
+                        help=f"Seconds without a heartbeat before a node's claimed document is retaken "
+                             f"(default: {DEFAULT_LEASE_SECONDS})")
+    parser.add_argument("--shard", type=_page_span_arg, metavar="START-STOP",
+                        help="Parse only these pages (1-based, inclusive) into a shard file for --merge")
+    parser.add_argument("--merge", nargs="+", metavar="SHARD",
+                        help="Combine shard files covering a whole document into the normal output")
+    args = parser.parse_args()
+    if sum(x is not None for x in (args.pdf, args.batch, args.merge)) != 1:
+        parser.error("give an input PDF, --batch or --merge")
+    args.config = ParserConfig(layout=args.layout)
+    if args.queue and not args.batch:
+        parser.error("--queue needs --batch")
+    if args.resume and (not args.batch or args.queue):
+        parser.error("--resume needs --batch (a --queue already skips finished documents)")
+    if args.index is not None and not needs_table_body(args.fields):
+        parser.error("--index records where each amendment ends; it needs content or amendment in --fields")
+
+    select = None
+    if args.author or args.section or args.ids is not None or args.limit is not None:
+        select = AmendmentFilter(author=args.author, section=args.section, ids=args.ids, limit=args.limit)
+        if args.index is not None:
+            parser.error("--index needs the full document; it cannot be combined with filters")
+
+    if args.scan and args.pdf:
+        sys.exit(_run_scan(args))
+    if args.merge:
+        sys.exit(_run_merge(args))
+    if args.shard:
+        if not args.pdf:
+            parser.error("--shard needs an input PDF")
+        sys.exit(_run_shard(args))
+
+    cache = result_cache = None
+    if not args.no_cache:
+        cache = SpanCache(args.cache_dir or default_cache_dir(), max_bytes=args.cache_size * 1024 * 1024)
+        if args.result_cache_size > 0:
+            result_cache = cache.results(max_bytes=args.result_cache_size * 1024 * 1024,
+                                         fast_fingerprint=args.fast_fingerprint)
+
+    if args.batch:
+        sys.exit(_run_batch(args, cache, result_cache))
+    if args.metrics:
+        result_cache = None  # --metrics times the parse itself
+    args.fingerprint = None  # hashed once, for both caches
+    if result_cache is not None:
+        args.fingerprint = result_cache.fingerprint(args.pdf)
+        args.result_key = result_cache.key(args.pdf, args.config, args.calibrate, args.fingerprint)
+        amendments = result_cache.get(args.result_key)
+        if amendments is not None:
+            sys.exit(_run_cached(args, amendments, select))
+    streamable = args.format == "jsonl" or select is not None or not needs_table_body(args.fields)
+    if (streamable and args.workers <= 1 and not args.columnar and not args.calibrate
+            and not args.metrics and args.index is None):
+        sys.exit(_run_stream(args, cache, select, result_cache))
+    sys.exit(_run_single(args, cache, select, result_cache))
+
 
 if __name__ == "__main__":
     main()
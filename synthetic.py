@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+"""
+Generate synthetic EP committee amendment PDFs of arbitrary size, with ground truth.
+
+Documents follow the layout of the bundled fixtures (see the coordinate
+reference in the README): bold ``Amendment N`` headers at x≈71, bold author
+and section lines, an italic column-header row, two-column table text at
+x≈71 and x≈315, an ``Or. en`` marker, the footer row at y≈771 and the large
+``EN`` watermark.  The expected parser output for every amendment is returned
+alongside the PDF, so correctness can be checked at any size:
+
+    python synthetic.py big.pdf --pages 5000 --truth big.truth.json
+"""
+
+import argparse
+import json
+import random
+import sys
+
+import parse_amendments as pa
+
+fitz = pa.fitz
+
+PAGE_WIDTH, PAGE_HEIGHT = 595.45, 841.7
+LEFT_X = 70.8
+RIGHT_X = 314.7
+LEFT_HEADER_X = 119.7
+RIGHT_HEADER_X = 391.3
+MARKER_X = 494.6
+TOP_Y = 67.9
+BODY_BOTTOM_Y = 740.0          # keep clear of FOOTER_Y_THRESHOLD
+FOOTER_Y = 771.4
+WATERMARK = (28.8, 808.3)
+LINE_HEIGHT = 13.8
+FONT_SIZE = 12
+COLUMN_WIDTH = 170.0
+
+REGULAR, BOLD, ITALIC, BOLD_ITALIC = "Times-Roman", "Times-Bold", "Times-Italic", "Times-BoldItalic"
+_FONT_CODES = {REGULAR: "tiro", BOLD: "tibo", ITALIC: "tiit", BOLD_ITALIC: "tibi"}
+
+FIRST_NAMES = ("Anna", "Lukas", "Maria", "Pierre", "Ingrid", "Tomasz", "Elena", "Jonas", "Sofia", "Marco")
+LAST_NAMES = ("Novak", "Schmidt", "Rossi", "Dubois", "Larsen", "Kowalski", "Costa", "Berg", "Horvat", "Meyer")
+GROUPS = ("the PPE Group", "the S&D Group", "the Renew Group", "the Verts/ALE Group", "the ECR Group")
+SECTION_PARENTS = ("Motion for a resolution", "Proposal for a regulation")
+SECTION_CHILDREN = ("Paragraph", "Recital", "Article", "Citation")
+WORDS = (
+    "the", "Union", "shall", "ensure", "that", "Member", "States", "market", "digital", "framework",
+    "measures", "competent", "authorities", "provide", "information", "within", "period", "of",
+    "and", "regulation", "transparency", "companies", "support", "small", "enterprises", "public",
+    "access", "data", "where", "appropriate", "including", "cross-border", "procedures", "reporting",
+)
+
+
+_FONTS = {}
+_WORD_WIDTHS = {}
+
+
+def _font(name: str) -> "fitz.Font":
+    if name not in _FONTS:
+        _FONTS[name] = fitz.Font(_FONT_CODES[name])
+    return _FONTS[name]
+
+
+def _width(word: str, font: str) -> float:
+    key = (word, font)
+    if key not in _WORD_WIDTHS:
+        _WORD_WIDTHS[key] = _font(font).text_length(word, fontsize=FONT_SIZE)
+    return _WORD_WIDTHS[key]
+
+
+def _wrap(text: str, font: str) -> list:
+    """Greedy word-wrap of ``text`` to the column width."""
+    space = _width(" ", font)
+    lines = []
+    current = []
+    width = 0.0
+    for word in text.split():
+        word_width = _width(word, font)
+        if current and width + space + word_width > COLUMN_WIDTH:
+            lines.append(" ".join(current))
+            current = []
+            width = 0.0
+        width += (space if current else 0.0) + word_width
+        current.append(word)
+    if current:
+        lines.append(" ".join(current))
+    return lines
+
+
+def _sentence(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words)).capitalize() + "."
+
+
+def make_amendment(rng: random.Random, number: int) -> dict:
+    """Random amendment content plus the record the parser is expected to produce."""
+    authors = [f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}" for _ in range(rng.randint(1, 3))]
+    behalf = f"on behalf of {rng.choice(GROUPS)}" if rng.random() < 0.5 else None
+    parent = rng.choice(SECTION_PARENTS)
+    section = [parent, f"{rng.choice(SECTION_CHILDREN)} {rng.randint(1, 60)}"]
+
+    kind = rng.random()
+    left_text = "" if kind < 0.2 else _sentence(rng, rng.randint(8, 60))
+    right_text = "deleted" if 0.2 <= kind < 0.3 else _sentence(rng, rng.randint(8, 60))
+    left = _wrap(left_text, ITALIC)
+    right = _wrap(right_text, BOLD_ITALIC)
+
+    author_lines = [", ".join(authors)] + ([behalf] if behalf else [])
+    return {
+        "number": number,
+        "author_lines": author_lines,
+        "section_lines": section,
+        "left_header": parent if parent == "Motion for a resolution" else "Text proposed by the Commission",
+        "left": left,
+        "right": right,
+        "expected": {
+            "id": f"Amendment {number}",
+            "authors": "; ".join(author_lines),
+            "section": " / ".join(section),
+            "content": "\n".join(left),
+            "amendment": "\n".join(right),
+            "warnings": [],
+        },
+    }
+
+
+class _Writer:
+    """Places lines top to bottom, starting new pages (with footer and watermark) as needed."""
+
+    def __init__(self, doc):
+        self.doc = doc
+        self.page = None
+        self.text_writer = None
+        self.y = BODY_BOTTOM_Y + 1
+
+    def _flush(self):
+        if self.text_writer is not None:
+            self.text_writer.write_text(self.page)
+
+    def new_page(self):
+        self._flush()
+        self.page = self.doc.new_page(width=PAGE_WIDTH, height=PAGE_HEIGHT)
+        self.text_writer = fitz.TextWriter(self.page.rect)
+        self.y = TOP_Y
+
+    def room(self) -> float:
+        return BODY_BOTTOM_Y - self.y if self.page is not None else -1
+
+    def text(self, x: float, text: str, font: str = REGULAR):
+        self.text_writer.append((x, self.y), text, font=_font(font), fontsize=FONT_SIZE)
+
+    def advance(self, lines: float = 1):
+        self.y += LINE_HEIGHT * lines
+        if self.y > BODY_BOTTOM_Y:
+            self.new_page()
+
+    def finish(self):
+        self._flush()
+        total = self.doc.page_count
+        footer_font = _font(REGULAR)
+        watermark_font = fitz.Font("hebo")
+        for number, page in enumerate(self.doc, start=1):
+            tw = fitz.TextWriter(page.rect)
+            tw.append((LEFT_X, FOOTER_Y), "PE000.000v01-00", font=footer_font, fontsize=11)
+            tw.append((285.0, FOOTER_Y), f"{number}/{total}", font=footer_font, fontsize=11)
+            tw.append((426.3, FOOTER_Y), "AM\\0000000EN.docx", font=footer_font, fontsize=11)
+            tw.append(WATERMARK, "EN", font=watermark_font, fontsize=24)
+            tw.write_text(page)
+
+
+def _write_amendment(w: _Writer, a: dict):
+    # Keep the header block (header, authors, section, column headings) on one page.
+    block = LINE_HEIGHT * (len(a["author_lines"]) + len(a["section_lines"]) + 5)
+    if w.room() < block:
+        w.new_page()
+
+    w.text(LEFT_X, f"Amendment {a['number']}", BOLD)
+    w.advance()
+    for line in a["author_lines"]:
+        w.text(LEFT_X, line, REGULAR if line.startswith("on behalf of") else BOLD)
+        w.advance()
+    w.advance(1)
+    for line in a["section_lines"]:
+        w.text(LEFT_X, line, BOLD)
+        w.advance()
+    w.advance(0.9)
+    w.text(LEFT_HEADER_X, a["left_header"], ITALIC)
+    w.text(RIGHT_HEADER_X, "Amendment", ITALIC)
+    w.advance(1.9)
+
+    for i in range(max(len(a["left"]), len(a["right"]))):
+        if i < len(a["left"]):
+            w.text(LEFT_X, a["left"][i], ITALIC)
+        if i < len(a["right"]):
+            w.text(RIGHT_X, a["right"][i], BOLD_ITALIC)
+        w.advance()
+
+    w.advance(1.3)
+    w.text(MARKER_X, "Or. en", REGULAR)
+    w.advance(3.7)
+
+
+def generate(path: str, amendments: int = None, pages: int = None, seed: int = 0,
+             first_id: int = 1) -> list:
+    """Write a synthetic document to ``path`` and return the expected parser output.
+
+    Generates ``amendments`` amendments, or keeps going until the document
+    reaches ``pages`` pages.
+    """
+    if (amendments is None) == (pages is None):
+        raise ValueError("give exactly one of amendments or pages")
+    rng = random.Random(seed)
+    doc = fitz.open()
+    writer = _Writer(doc)
+    expected = []
+    number = first_id
+    while (amendments is not None and len(expected) < amendments) or \
+            (pages is not None and doc.page_count < pages):
+        a = make_amendment(rng, number)
+        _write_amendment(writer, a)
+        expected.append(a["expected"])
+        number += 1
+    writer.finish()
+    doc.save(path, garbage=3, deflate=True)
+    doc.close()
+    return expected
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic EP amendments PDF with ground truth")
+    parser.add_argument("output", help="Output PDF file")
+    size = parser.add_mutually_exclusive_group(required=True)
+    size.add_argument("--amendments", type=int, help="Number of amendments to generate")
+    size.add_argument("--pages", type=int, help="Generate amendments until the document has this many pages")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed (default: 0)")
+    parser.add_argument("--first-id", type=int, default=1, help="Number of the first amendment (default: 1)")
+    parser.add_argument("--truth", help="Write the expected parser output to this JSON file")
+    args = parser.parse_args()
+
+    expected = generate(args.output, amendments=args.amendments, pages=args.pages,
+                        seed=args.seed, first_id=args.first_id)
+    print(f"Wrote {len(expected)} amendments to {args.output}", file=sys.stderr)
+    if args.truth:
+        with open(args.truth, "w", encoding="utf-8") as f:
+            json.dump(expected, f, ensure_ascii=False, indent=2)
+        print(f"Ground truth written to {args.truth}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -12,9 +12,15 @@ Each document uses the parsed result computed once per session via a
 module-level fixture.
 """
 
+import io
 import json
+import os
+import re
 import subprocess
 import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import replace
 from pathlib import Path
 
 import pytest
@@ -22,42 +28,41 @@ import pytest
 TESTS_DIR = Path(__file__).parent
 PARSER = TESTS_DIR.parent / "parse_amendments.py"
 
+sys.path.insert(0, str(PARSER.parent))
+import parse_amendments  # noqa: E402
+import benchmark  # noqa: E402
+import synthetic  # noqa: E402
+import tune  # noqa: E402
+
 JURI_PDF = TESTS_DIR / "JURI-AM-776972_EN.pdf"
 IMCO_PDF = TESTS_DIR / "IMCO-AM-773238_EN.pdf"
 ENVI_PDF = TESTS_DIR / "ENVI-AM-776927_EN.pdf"
 TRAN_PDF = TESTS_DIR / "TRAN-AM-777048_EN.pdf"
 
 
-def _parse(pdf_path: Path, tmp_path_factory) -> dict:
-    out = tmp_path_factory.mktemp("output") / "amendments.json"
-    result = subprocess.run(
-        [sys.executable, str(PARSER), str(pdf_path), "-o", str(out)],
-        capture_output=True,
-        text=True,
-    )
-    assert result.returncode == 0, f"Parser exited with code {result.returncode}:\n{result.stderr}"
-    data = json.loads(out.read_text(encoding="utf-8"))
+def _parse(pdf_path: Path) -> dict:
+    data = parse_amendments.amendments_to_json(parse_amendments.parse_pdf(pdf_path))
     return {a["id"]: a for a in data}
 
 
 @pytest.fixture(scope="session")
-def amendments(tmp_path_factory):
-    return _parse(JURI_PDF, tmp_path_factory)
+def amendments():
+    return _parse(JURI_PDF)
 
 
 @pytest.fixture(scope="session")
-def imco(tmp_path_factory):
-    return _parse(IMCO_PDF, tmp_path_factory)
+def imco():
+    return _parse(IMCO_PDF)
 
 
 @pytest.fixture(scope="session")
-def envi(tmp_path_factory):
-    return _parse(ENVI_PDF, tmp_path_factory)
+def envi():
+    return _parse(ENVI_PDF)
 
 
 @pytest.fixture(scope="session")
-def tran(tmp_path_factory):
-    return _parse(TRAN_PDF, tmp_path_factory)
+def tran():
+    return _parse(TRAN_PDF)
 
 
 KNOWN_WARNING_TYPES = {
@@ -207,3 +212,758 @@ def test_tran_amendment_11_section(tran):
 
 def test_tran_amendment_100_author(tran):
     assert "Ana Vasconcelos" in tran["Amendment 100"]["authors"]
+
+
+# ── parallel extraction ───────────────────────────────────────────────────────
+
+def test_parallel_extraction_matches_serial(tmp_path):
+    outputs = []
+    for workers in ("1", "3"):
+        out = tmp_path / f"workers-{workers}.json"
+        result = subprocess.run(
+            [sys.executable, str(PARSER), str(TRAN_PDF), "-o", str(out), "--workers", workers, "--no-cache"],
+            capture_output=True,
+            text=True,
+        )
+        assert result.returncode == 0, result.stderr
+        outputs.append(out.read_bytes())
+    assert outputs[0] == outputs[1]
+
+
+# ── streaming pipeline ────────────────────────────────────────────────────────
+
+def test_streaming_matches_batch(imco):
+    streamed = parse_amendments.amendments_to_json(
+        parse_amendments.iter_pdf_amendments(str(IMCO_PDF))
+    )
+    assert {a["id"]: a for a in streamed} == imco
+
+
+def test_streaming_yields_before_input_is_exhausted():
+    pages_read = []
+
+    def counting_spans():
+        for span in parse_amendments.iter_spans(str(JURI_PDF)):
+            if not pages_read or pages_read[-1] != span.page_num:
+                pages_read.append(span.page_num)
+            yield span
+
+    stream = parse_amendments.iter_amendments(parse_amendments.iter_lines(counting_spans()))
+    first = next(stream)
+    assert first.id == "Amendment 1"
+    assert "no_language_marker" not in first.warnings
+    assert pages_read[-1] < 10
+
+
+def test_streaming_fills_span_cache_as_it_goes(tmp_path, amendments):
+    cache = parse_amendments.SpanCache(str(tmp_path))
+    key = cache.key(str(JURI_PDF))
+    stream = parse_amendments.iter_pdf_amendments(str(JURI_PDF), cache=cache)
+    assert next(stream).id == "Amendment 1"
+    assert cache.load(key) is None
+    stream.close()  # an abandoned stream leaves nothing behind
+    assert os.listdir(tmp_path) == []
+    unread = parse_amendments.iter_pdf_amendments(str(JURI_PDF), cache=cache)
+    del unread  # nor does one that is never started
+    assert os.listdir(tmp_path) == []
+
+    streamed = parse_amendments.amendments_to_json(parse_amendments.iter_pdf_amendments(str(JURI_PDF), cache=cache))
+    assert streamed == list(amendments.values())
+    assert cache.load(key) == parse_amendments.extract_spans(str(JURI_PDF))
+
+
+# ── columnar span store ───────────────────────────────────────────────────────
+
+def test_columnar_pipeline_matches_objects():
+    pytest.importorskip("numpy")
+    spans = parse_amendments.extract_spans(str(ENVI_PDF))
+    lines = parse_amendments.assemble_lines(spans)
+
+    columns = parse_amendments.extract_span_columns(str(ENVI_PDF))
+    line_columns = parse_amendments.assemble_line_columns(columns)
+
+    assert len(columns) == len(spans)
+    assert line_columns.to_lines() == lines
+    assert parse_amendments.parse_amendments(line_columns) == parse_amendments.parse_amendments(lines)
+
+
+# ── span cache ────────────────────────────────────────────────────────────────
+
+def test_span_cache_round_trip(tmp_path):
+    cache = parse_amendments.SpanCache(str(tmp_path))
+    spans = parse_amendments.load_spans(str(TRAN_PDF), cache=cache)
+    key = cache.key(str(TRAN_PDF))
+    assert cache.load(key) == spans
+    assert parse_amendments.load_spans(str(TRAN_PDF), cache=cache) == spans
+
+
+def test_span_cache_evicts_least_recently_used(tmp_path):
+    spans = parse_amendments.extract_spans(str(TRAN_PDF))[:100]
+    cache = parse_amendments.SpanCache(str(tmp_path), max_bytes=10_000)
+    cache.store("old", spans)
+    # unfinished entries of a dead writer go too, those of a live one stay
+    dead, live = tmp_path / "dead.spans.1.tmp", tmp_path / "live.spans.2.tmp"
+    dead.write_bytes(b"x")
+    live.write_bytes(b"x")
+    os.utime(dead, (0, 0))
+    cache.store("new", spans)
+    assert cache.load("old") is None
+    assert cache.load("new") == spans
+    assert not dead.exists() and live.exists()
+
+
+def test_span_cache_discards_truncated_entries(tmp_path):
+    spans = parse_amendments.extract_spans(str(TRAN_PDF))[:100]
+    cache = parse_amendments.SpanCache(str(tmp_path))
+    cache.store("key", spans)
+    path = Path(cache._path("key"))
+    entry = path.read_bytes()
+    for broken in (entry[:6], entry[:-5], b""):
+        path.write_bytes(broken)
+        assert cache.load("key") is None
+        assert not path.exists()
+    assert parse_amendments.load_spans(str(TRAN_PDF), cache=cache) == parse_amendments.extract_spans(str(TRAN_PDF))
+
+
+# ── result cache ──────────────────────────────────────────────────────────────
+
+def test_result_cache_answers_repeats_without_parsing(tmp_path, monkeypatch, envi):
+    cache = parse_amendments.ResultCache(str(tmp_path))
+    first = parse_amendments.parse_pdf(str(ENVI_PDF), result_cache=cache)
+    assert parse_amendments.amendments_to_json(first) == list(envi.values())
+
+    def no_parse(*args, **kwargs):
+        raise AssertionError("document parsed again")
+
+    monkeypatch.setattr(parse_amendments, "_parse_source", no_parse)
+    assert parse_amendments.parse_pdf(ENVI_PDF.read_bytes(), result_cache=cache) == first
+    for select in (parse_amendments.AmendmentFilter(ids=frozenset(range(200, 260)), author="Ozdoba"),
+                   parse_amendments.AmendmentFilter(section="point 2", limit=5)):
+        monkeypatch.undo()
+        expected = parse_amendments.parse_pdf(str(ENVI_PDF), select=select)
+        monkeypatch.setattr(parse_amendments, "_parse_source", no_parse)
+        assert parse_amendments.parse_pdf(str(ENVI_PDF), select=select, result_cache=cache) == expected
+
+    # a changed parser is a different entry
+    monkeypatch.setattr(parse_amendments, "_PARSER_VERSION", "edited+pymupdf")
+    with pytest.raises(AssertionError):
+        parse_amendments.parse_pdf(str(ENVI_PDF), result_cache=cache)
+    monkeypatch.setattr(parse_amendments, "_PARSER_VERSION", None)
+
+    # other settings are a different entry
+    shifted = parse_amendments.ParserConfig(layout=parse_amendments.LayoutProfile("shifted", column_split=250))
+    with pytest.raises(AssertionError):
+        parse_amendments.parse_pdf(str(ENVI_PDF), config=shifted, result_cache=cache)
+
+
+def test_result_cache_fingerprints_and_eviction(tmp_path):
+    data = ENVI_PDF.read_bytes()
+    fast = parse_amendments.source_fingerprint(data, fast=True)
+    assert fast == parse_amendments.source_fingerprint(str(ENVI_PDF), fast=True)
+    assert parse_amendments.source_fingerprint(data) == parse_amendments.source_sha256(data)
+    appended = data + b"%%EOF\n"
+    assert parse_amendments.source_fingerprint(appended, fast=True) != fast
+
+    amendments = [parse_amendments.Amendment(id=f"Amendment {n}", content="x" * 1000) for n in range(5)]
+    cache = parse_amendments.ResultCache(str(tmp_path), max_bytes=8_000)
+    cache.put("old", amendments)
+    cache.put("new", amendments)
+    assert cache.get("old") is None
+    assert cache.get("new") == amendments
+
+    writer = cache.writer("streamed")
+    writer.add(amendments[0])
+    writer.discard()  # an interrupted stream stores nothing
+    assert cache.get("streamed") is None
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["new.json"]
+
+
+# ── library API ───────────────────────────────────────────────────────────────
+
+def test_cli_matches_library(tmp_path, tran):
+    out = tmp_path / "amendments.json"
+    result = subprocess.run(
+        [sys.executable, str(PARSER), str(TRAN_PDF), "-o", str(out), "--no-cache"],
+        capture_output=True,
+        text=True,
+    )
+    assert result.returncode == 0, f"Parser exited with code {result.returncode}:\n{result.stderr}"
+    data = json.loads(out.read_text(encoding="utf-8"))
+    assert {a["id"]: a for a in data} == tran
+
+
+def test_parse_pdf_accepts_bytes():
+    from_path = parse_amendments.parse_pdf(str(TRAN_PDF))
+    from_bytes = parse_amendments.parse_pdf(TRAN_PDF.read_bytes())
+    assert from_bytes == from_path
+    assert parse_amendments.parse_pdf(TRAN_PDF.read_bytes()) == from_path
+
+
+# ── batch mode ────────────────────────────────────────────────────────────────
+
+def test_batch_reports_failures_without_aborting(tmp_path, tran):
+    corpus = tmp_path / "corpus"
+    (corpus / "tran").mkdir(parents=True)
+    (corpus / "tran" / TRAN_PDF.name).write_bytes(TRAN_PDF.read_bytes())
+    (corpus / "broken.pdf").write_bytes(b"not a pdf")
+
+    sources = parse_amendments.batch_sources(str(corpus))
+    results = list(parse_amendments.iter_batch(sources, str(tmp_path / "out"), workers=2))
+
+    by_source = {Path(r.source).name: r for r in results}
+    assert by_source["broken.pdf"].error
+    ok = by_source[TRAN_PDF.name]
+    assert ok.error is None
+    assert ok.output == str(tmp_path / "out" / "tran" / "TRAN-AM-777048_EN.json")
+    data = json.loads(Path(ok.output).read_text(encoding="utf-8"))
+    assert {a["id"]: a for a in data} == tran
+
+
+def test_batch_resume_skips_current_documents(tmp_path):
+    corpus = tmp_path / "corpus"
+    corpus.mkdir()
+    for name in ("one.pdf", "two.pdf"):
+        (corpus / name).write_bytes(TRAN_PDF.read_bytes())
+    sources = parse_amendments.batch_sources(str(corpus))
+    out_dir = str(tmp_path / "out")
+    checkpoint_path = os.path.join(out_dir, parse_amendments.CHECKPOINT_NAME)
+
+    def run(config=parse_amendments.DEFAULT_CONFIG):
+        checkpoint = parse_amendments.BatchCheckpoint(checkpoint_path)
+        results = parse_amendments.iter_batch(sources, out_dir, config=config, checkpoint=checkpoint, resume=True)
+        return {Path(r.source).name: r.skipped for r in results}
+
+    assert run() == {"one.pdf": False, "two.pdf": False}
+    assert run() == {"one.pdf": True, "two.pdf": True}
+
+    # same content with a new mtime is still current; changed content or a lost output is not
+    os.utime(sources[0])
+    (corpus / "two.pdf").write_bytes(TRAN_PDF.read_bytes() + b"\n")
+    assert run() == {"one.pdf": True, "two.pdf": False}
+    os.remove(os.path.join(out_dir, "one.json"))
+    assert run() == {"one.pdf": False, "two.pdf": True}
+
+    # a different config redoes everything
+    layout = replace(parse_amendments.DEFAULT_LAYOUT, column_split=250)
+    assert run(parse_amendments.ParserConfig(layout=layout)) == {"one.pdf": False, "two.pdf": False}
+
+    # a torn final line from a crash is ignored
+    with open(checkpoint_path, "a", encoding="utf-8") as f:
+        f.write('{"path": "/trunc')
+    assert len(parse_amendments.BatchCheckpoint(checkpoint_path).records) == 2
+
+
+def test_batch_hashes_each_document_once(tmp_path, monkeypatch):
+    (tmp_path / "one.pdf").write_bytes(TRAN_PDF.read_bytes())
+    sources = [str(tmp_path / "one.pdf")]
+    out_dir = str(tmp_path / "out")
+    checkpoint_path = os.path.join(out_dir, parse_amendments.CHECKPOINT_NAME)
+    cache = parse_amendments.SpanCache(str(tmp_path / "spans"))
+    result_cache = cache.results(fast_fingerprint=True)
+
+    hashed = []
+    fingerprint = parse_amendments.source_fingerprint
+    monkeypatch.setattr(parse_amendments, "source_fingerprint",
+                        lambda source, fast=False: hashed.append(fast) or fingerprint(source, fast))
+    monkeypatch.setattr(parse_amendments, "file_sha256", lambda *a, **kw: pytest.fail("full SHA-256 computed"))
+
+    def run():
+        checkpoint = parse_amendments.BatchCheckpoint(checkpoint_path)
+        return list(parse_amendments.iter_batch(sources, out_dir, cache=cache, result_cache=result_cache,
+                                                checkpoint=checkpoint, resume=True, fast_fingerprint=True))
+
+    [result] = run()
+    assert hashed == [True]  # one fast fingerprint keys both caches
+    [record] = parse_amendments.BatchCheckpoint(checkpoint_path).records.values()
+    assert record["fingerprint"] == result.fingerprint and result.fingerprint.startswith("fast:")
+
+    # a touched file is checked against the recorded fast fingerprint
+    os.utime(sources[0], ns=(0, 0))
+    [result] = run()
+    assert result.skipped and hashed == [True, True]
+
+
+def test_work_queue_retakes_expired_leases(tmp_path, tran):
+    corpus = tmp_path / "corpus"
+    for name in ("a", "b"):
+        (corpus / name).mkdir(parents=True)
+        (corpus / name / TRAN_PDF.name).write_bytes(TRAN_PDF.read_bytes())
+    sources = parse_amendments.batch_sources(str(corpus))
+    out_dir = str(tmp_path / "out")
+    keys = [parse_amendments.WorkQueue.job_key(os.path.join(name, "TRAN-AM-777048_EN.json")) for name in "ab"]
+
+    # node "crashed" holds a; node "live" holds b with a fresh lease
+    crashed = parse_amendments.WorkQueue(str(tmp_path / "queue"), lease_seconds=60, worker="crashed")
+    live = parse_amendments.WorkQueue(crashed.directory, lease_seconds=60, worker="live")
+    assert crashed.claim(keys[0], sources[0])
+    assert live.claim(keys[1], sources[1])
+    assert not live.claim(keys[0], sources[0])
+    stale = time.time() - 120
+    os.utime(os.path.join(crashed.directory, "locks", keys[0] + ".lock"), (stale, stale))
+
+    node = parse_amendments.WorkQueue(crashed.directory, lease_seconds=60, worker="node")
+    results = []
+    for result in parse_amendments.iter_queue(sources, out_dir, node):
+        results.append(result)
+        # the live node finishes b while this one waits for it
+        assert live.complete(keys[1], parse_amendments.BatchResult(source=sources[1], output=""))
+    assert [r.source for r in results] == [sources[0]]
+    data = json.loads(Path(results[0].output).read_text(encoding="utf-8"))
+    assert {a["id"]: a for a in data} == tran
+
+    assert not crashed.complete(keys[0], parse_amendments.BatchResult(source=sources[0], output=""))
+    records = parse_amendments.write_queue_manifest(node, str(tmp_path / "out" / "manifest.json"))
+    assert [(r["source"], r["worker"]) for r in records] == [(sources[0], "node"), (sources[1], "live")]
+    assert not os.listdir(os.path.join(node.directory, "locks"))
+
+
+# ── sharded state machine ─────────────────────────────────────────────────────
+
+def test_sharded_state_machine_matches_serial(monkeypatch):
+    lines = parse_amendments.assemble_lines(parse_amendments.extract_spans(str(JURI_PDF)))
+    positions = parse_amendments.header_positions(lines)
+    # drop amendment 100 entirely so a non_sequential_id warning has to cross a shard edge
+    start_100 = next(i for i, n in positions if n == 100)
+    start_101 = next(i for i, n in positions if n == 101)
+    lines = lines[:start_100] + lines[start_101:]
+    serial = parse_amendments.parse_amendments(lines)
+    assert any(w.startswith("non_sequential_id") for a in serial for w in a.warnings)
+
+    positions = parse_amendments.header_positions(lines)
+    config = parse_amendments.DEFAULT_CONFIG
+    one_per_header = [
+        a for start, stop, prev in parse_amendments._shard_bounds(positions, len(lines), len(positions))
+        for a in parse_amendments._parse_shard(start, stop, prev, False, config, lines[start:stop])
+    ]
+    assert one_per_header == serial
+
+    monkeypatch.setattr(parse_amendments, "SHARD_MIN_AMENDMENTS", 1)
+    assert parse_amendments.parse_amendments_sharded(lines, workers=2) == serial
+
+
+def test_sharded_parses_run_concurrently(monkeypatch):
+    monkeypatch.setattr(parse_amendments, "SHARD_MIN_AMENDMENTS", 1)
+    contexts = []
+    get_context = parse_amendments.multiprocessing.get_context
+    monkeypatch.setattr(parse_amendments.multiprocessing, "get_context",
+                        lambda method=None: contexts.append(method) or get_context(method))
+    docs = [parse_amendments.assemble_lines(parse_amendments.extract_spans(str(pdf))) for pdf in (JURI_PDF, IMCO_PDF)]
+    serial = [parse_amendments.parse_amendments(lines) for lines in docs]
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        results = list(pool.map(lambda lines: parse_amendments.parse_amendments_sharded(lines, workers=2), docs))
+    assert results == serial
+    assert len(contexts) == 2 and "fork" not in contexts  # no fork from a multi-threaded process
+
+
+# ── output writers ────────────────────────────────────────────────────────────
+
+@pytest.mark.parametrize("indent", [2, None])
+@pytest.mark.parametrize("count", [0, 1, 5])
+def test_streaming_json_array_matches_json_dump(indent, count):
+    amendments = parse_amendments.parse_pdf(TRAN_PDF)[:count]
+    buf = io.StringIO()
+    parse_amendments.write_json_array(iter(amendments), buf, indent=indent)
+    expected = json.dumps(parse_amendments.amendments_to_json(amendments), ensure_ascii=False, indent=indent)
+    assert buf.getvalue() == expected
+
+
+def test_jsonl_to_stdout(tran):
+    result = subprocess.run(
+        [sys.executable, str(PARSER), str(TRAN_PDF), "--format", "jsonl", "-o", "-", "--no-cache"],
+        capture_output=True,
+        text=True,
+        encoding="utf-8",
+    )
+    assert result.returncode == 0, result.stderr
+    records = [json.loads(line) for line in result.stdout.splitlines()]
+    assert {a["id"]: a for a in records} == tran
+
+
+def test_json_to_stdout_ends_with_a_newline(tran):
+    result = subprocess.run(
+        [sys.executable, str(PARSER), str(TRAN_PDF), "-o", "-", "--no-cache"],
+        capture_output=True,
+        text=True,
+        encoding="utf-8",
+    )
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.endswith("]\n")
+    assert {a["id"]: a for a in json.loads(result.stdout)} == tran
+
+
+# ── metrics ───────────────────────────────────────────────────────────────────
+
+def test_metrics_report(tmp_path):
+    metrics_path = tmp_path / "metrics.json"
+    result = subprocess.run(
+        [sys.executable, str(PARSER), str(TRAN_PDF), "-o", str(tmp_path / "out.json"),
+         "--no-cache", "--metrics", str(metrics_path)],
+        capture_output=True,
+        text=True,
+    )
+    assert result.returncode == 0, result.stderr
+    metrics = json.loads(metrics_path.read_text(encoding="utf-8"))
+    assert set(metrics["phases"]) == {"span_extraction", "line_assembly", "state_machine", "serialisation"}
+    assert metrics["counts"]["pages"] == 122
+    assert metrics["counts"]["amendments"] == 197
+    assert [p["page"] for p in metrics["pages"]] == list(range(1, 123))
+    assert sum(p["spans"] for p in metrics["pages"]) == metrics["counts"]["spans"]
+    assert metrics["throughput"]["pages_per_s"] > 0
+
+
+def test_metrics_report_no_extraction_rates_on_a_cache_hit(tmp_path):
+    cache = parse_amendments.SpanCache(str(tmp_path))
+    parse_amendments.load_spans(str(TRAN_PDF), cache=cache)
+    timer = parse_amendments.PhaseTimer()
+    page_stats = []
+    with timer.phase("span_extraction"):
+        spans = parse_amendments.load_spans(str(TRAN_PDF), cache=cache, page_stats=page_stats)
+    with timer.phase("state_machine"):
+        lines = parse_amendments.assemble_lines(spans)
+    metrics = parse_amendments.build_metrics(str(TRAN_PDF), timer, 122, len(spans), len(lines), 197, page_stats)
+    assert metrics["cache_hit"]
+    assert metrics["throughput"]["pages_per_s"] is None and metrics["throughput"]["spans_per_s"] is None
+    assert metrics["throughput"]["lines_per_s"] > 0
+
+
+# ── benchmark ─────────────────────────────────────────────────────────────────
+
+def test_benchmark_results_are_comparable():
+    results = benchmark.run_benchmarks([TRAN_PDF], repeats=1, warmup=0)
+    doc = results["documents"][TRAN_PDF.name]
+    assert set(doc["phases"]) == set(benchmark.PHASES)
+    assert doc["counts"]["amendments"] == 197
+    rows = benchmark.compare(results, results)
+    assert len(rows) == len(benchmark.PHASES)
+    assert all(change == 0 for *_, change in rows)
+
+
+# ── parameter sweep ───────────────────────────────────────────────────────────
+
+def test_sweep_scores_and_pareto_front():
+    documents = tune.load_documents({str(TRAN_PDF): "5-201"})
+    grid = tune.parse_grid(["ambiguous_low=220,250", "ambiguous_high=240,300", "header_min_size=11,30"])
+    results = tune.run_sweep(documents, grid)
+    assert len(results) == 6  # 220–240, 220–300, 250–300 bands × 2 header sizes
+    by_setting = {tuple(sorted(r["setting"].items())): r for r in results}
+    default = by_setting[(("ambiguous_high", 300.0), ("ambiguous_low", 220.0), ("header_min_size", 11.0))]
+    assert default["id_errors"] == 0
+    # headers are 12 pt, so a 30 pt minimum finds no amendments at all
+    assert all(r["missing_ids"] == 197 for r in results if r["setting"]["header_min_size"] == 30)
+    front = tune.pareto_front(results)
+    # best agreement first; finding nothing (no warnings either) is the other extreme
+    assert front[0]["id_errors"] == 0
+    assert front[0]["warnings"] == min(r["warnings"] for r in results if r["id_errors"] == 0)
+    assert front[-1]["id_errors"] == 197 and front[-1]["warnings"] == 0
+
+    # a later sweep in the same process scores only its own corpus
+    [imco] = tune.run_sweep(tune.load_documents({str(IMCO_PDF): "1-217"}), {})
+    assert imco["warnings"] == sum(len(a.warnings) for a in parse_amendments.parse_pdf(IMCO_PDF))
+
+
+# ── synthetic documents ───────────────────────────────────────────────────────
+
+def _gap_pdf(tmp_path) -> tuple:
+    """Synthetic amendments 3–7 then 10–14 (8 and 9 left out); returns the path and the last page before the gap."""
+    synthetic.generate(str(tmp_path / "a.pdf"), amendments=5, first_id=3)
+    synthetic.generate(str(tmp_path / "b.pdf"), amendments=5, first_id=10)
+    doc = parse_amendments.fitz.open(str(tmp_path / "a.pdf"))
+    seam = doc.page_count
+    doc.insert_pdf(parse_amendments.fitz.open(str(tmp_path / "b.pdf")))
+    path = str(tmp_path / "gap.pdf")
+    doc.save(path)
+    return path, seam
+
+
+def test_synthetic_document_matches_ground_truth(tmp_path):
+    pdf = tmp_path / "synthetic.pdf"
+    expected = synthetic.generate(str(pdf), amendments=80, seed=7, first_id=20)
+    assert parse_amendments.pdf_page_count(str(pdf)) > 5
+    assert parse_amendments.amendments_to_json(parse_amendments.parse_pdf(pdf)) == expected
+
+
+# ── quick scan ────────────────────────────────────────────────────────────────
+
+def _header_pages(pdf_path: Path) -> list:
+    lines = parse_amendments.assemble_lines(parse_amendments.extract_spans(str(pdf_path)))
+    headers = []
+    for line in lines:
+        m = parse_amendments.AMENDMENT_RE.match(parse_amendments.line_text(line))
+        if m and parse_amendments.line_is_bold(line):
+            headers.append((int(m.group(1)), line.page_num))
+    return headers
+
+
+@pytest.mark.parametrize("pdf_path", [JURI_PDF, IMCO_PDF, ENVI_PDF, TRAN_PDF], ids=lambda p: p.stem)
+def test_scan_matches_full_parse(pdf_path):
+    result = parse_amendments.scan_amendments(str(pdf_path))
+    assert result.method == "content-stream"
+    assert result.headers == _header_pages(pdf_path)
+    assert result.missing == []
+    assert result.out_of_order == []
+
+
+def test_scan_reports_gaps_in_text_mode(tmp_path):
+    # synthetic documents use hex-encoded strings
+    pdf, _ = _gap_pdf(tmp_path)
+    result = parse_amendments.scan_amendments(pdf)
+    assert result.method == "text"
+    assert [n for n, _ in result.headers] == [3, 4, 5, 6, 7, 10, 11, 12, 13, 14]
+    assert result.missing == [8, 9]
+
+
+def test_scan_handles_mixed_string_encodings(tmp_path):
+    # literal-string pages of JURI followed by hex-string synthetic pages
+    doc = parse_amendments.fitz.open(str(JURI_PDF))
+    doc.select(range(5))
+    literal = [n for page in doc for n in parse_amendments.page_headers(page)]
+    synthetic.generate(str(tmp_path / "hex.pdf"), amendments=4, first_id=literal[-1] + 1)
+    doc.insert_pdf(parse_amendments.fitz.open(str(tmp_path / "hex.pdf")))
+    doc.save(str(tmp_path / "mixed.pdf"))
+
+    result = parse_amendments.scan_amendments(str(tmp_path / "mixed.pdf"))
+    assert result.method == "mixed"
+    assert [n for n, _ in result.headers] == literal + list(range(literal[-1] + 1, literal[-1] + 5))
+    assert result.missing == []
+
+
+def test_sequence_gaps():
+    missing, out_of_order = parse_amendments.sequence_gaps([1, 2, 5, 4, 6, 6, 8])
+    assert missing == [3, 4, 7]
+    assert out_of_order == [4, 6]
+
+
+# ── random access ───────────────────────────────────────────────────────────────
+
+def test_get_amendment_matches_full_parse():
+    full = {a.id: a for a in parse_amendments.parse_pdf(JURI_PDF)}
+    for n in [1, 2, 100, 292, 344] + list(range(3, 344, 23)):
+        assert parse_amendments.get_amendment(str(JURI_PDF), n) == full[f"Amendment {n}"], n
+
+
+def test_get_amendment_absent():
+    assert parse_amendments.get_amendment(str(ENVI_PDF), 171) is None
+    assert parse_amendments.get_amendment(str(ENVI_PDF), 407) is None
+
+
+def _kerned_headers_pdf(tmp_path) -> str:
+    """JURI pages 4–6 (amendments 4–11) with every header shown as a kerned ``[(Amend)-12(ment)…]TJ``."""
+    doc = parse_amendments.fitz.open(str(JURI_PDF))
+    doc.select([3, 4, 5])
+    for page in doc:
+        for xref in page.get_contents():
+            contents = re.sub(rb"\[\(Amendment\)(-?[\d.]+)\(", rb"[(Amend)-12(ment)\1(", doc.xref_stream(xref))
+            doc.update_stream(xref, contents)
+    path = str(tmp_path / "kerned.pdf")
+    doc.save(path)
+    return path
+
+
+def test_get_amendment_finds_kerned_headers(tmp_path):
+    pdf = _kerned_headers_pdf(tmp_path)
+    full = parse_amendments.parse_pdf(pdf)
+    assert [a.id for a in full] == [f"Amendment {n}" for n in range(4, 12)]
+    for a in full:
+        assert parse_amendments.get_amendment(pdf, int(a.id.split()[1])) == a
+
+
+# ── amendment index ─────────────────────────────────────────────────────────────
+
+def test_index_partial_parse_matches_full_parse(tmp_path):
+    full = parse_amendments.parse_pdf(TRAN_PDF)
+    path = tmp_path / "tran.amidx.json"
+    parse_amendments.build_index(str(TRAN_PDF), full).save(str(path))
+
+    index = parse_amendments.AmendmentIndex.load(str(path))
+    assert [e[0] for e in index.entries] == list(range(5, 202))
+    subset = parse_amendments.parse_indexed(str(TRAN_PDF), [5, 60, 61, 62, 201], index)
+    expected = [a for a in full if a.id in {"Amendment 5", "Amendment 60", "Amendment 61",
+                                            "Amendment 62", "Amendment 201"}]
+    assert subset == expected
+
+
+def test_index_rejects_other_document():
+    index = parse_amendments.build_index(str(TRAN_PDF))
+    with pytest.raises(ValueError):
+        parse_amendments.parse_indexed(str(IMCO_PDF), [5], index)
+
+
+# ── lazy document ─────────────────────────────────────────────────────────────
+
+def test_amendment_document_is_lazy_and_complete(imco):
+    with parse_amendments.AmendmentDocument(str(IMCO_PDF)) as doc:
+        assert len(doc) == 217
+        assert 100 in doc and 218 not in doc
+
+        a = doc[100]
+        assert a.authors == imco["Amendment 100"]["authors"]
+        assert len(doc._page_spans) < 5
+        assert doc[100] is a
+
+        assert parse_amendments.amendments_to_json(doc) == list(imco.values())
+        with pytest.raises(KeyError):
+            doc[218]
+
+
+def test_amendment_document_finds_kerned_headers(tmp_path):
+    pdf = _kerned_headers_pdf(tmp_path)
+    with parse_amendments.AmendmentDocument(pdf) as doc:
+        assert doc.numbers == list(range(4, 12))
+        assert 5 in doc
+        assert list(doc) == parse_amendments.parse_pdf(pdf)
+
+
+# ── filters ───────────────────────────────────────────────────────────────────
+
+def test_parse_id_ranges():
+    assert parse_amendments.parse_id_ranges("1,5,7-9") == {1, 5, 7, 8, 9}
+
+
+def test_filtered_parse_matches_full_parse(amendments):
+    select = parse_amendments.AmendmentFilter(
+        author="Axel Voss", section="Recital", ids=parse_amendments.parse_id_ranges("1-100")
+    )
+    filtered = parse_amendments.amendments_to_json(parse_amendments.parse_pdf(JURI_PDF, select=select))
+    expected = [
+        a for a in amendments.values()
+        if "Axel Voss" in a["authors"] and "Recital" in a["section"] and int(a["id"].split()[-1]) <= 100
+    ]
+    assert filtered and filtered == expected
+
+
+def test_filtered_parse_stops_extraction_early():
+    pages_read = set()
+
+    def counting_spans():
+        for span in parse_amendments.iter_spans(str(JURI_PDF)):
+            pages_read.add(span.page_num)
+            yield span
+
+    select = parse_amendments.AmendmentFilter(limit=5)
+    first = list(parse_amendments.iter_amendments(parse_amendments.iter_lines(counting_spans()), select=select))
+    assert [a.id for a in first] == [f"Amendment {n}" for n in range(1, 6)]
+    assert max(pages_read) < 10
+
+
+# ── field projection ──────────────────────────────────────────────────────────
+
+@pytest.mark.parametrize("pdf_path", [JURI_PDF, ENVI_PDF], ids=["JURI", "ENVI"])
+def test_header_only_parse_matches_full_parse(pdf_path):
+    fields = parse_amendments.parse_fields("id,authors,section")
+    full = parse_amendments.parse_pdf(pdf_path)
+    header_only = parse_amendments.parse_pdf(pdf_path, header_only=True)
+    assert parse_amendments.amendments_to_json(header_only, fields) == \
+        parse_amendments.amendments_to_json(full, fields)
+    assert all(a.content == "" and a.amendment == "" for a in header_only)
+
+
+def test_header_only_parse_reads_kerned_headers(tmp_path):
+    # headers the content-stream regex cannot see must not make their pages look skippable
+    pdf = _kerned_headers_pdf(tmp_path)
+    fields = parse_amendments.parse_fields("id,authors,section")
+    header_only = parse_amendments.parse_pdf(pdf, header_only=True)
+    assert len(header_only) == 8
+    assert parse_amendments.amendments_to_json(header_only, fields) == \
+        parse_amendments.amendments_to_json(parse_amendments.parse_pdf(pdf), fields)
+
+
+def test_fields_option(tmp_path, tran):
+    out = tmp_path / "out.jsonl"
+    subprocess.run(
+        [sys.executable, str(PARSER), str(TRAN_PDF), "-o", str(out), "--format", "jsonl",
+         "--fields", "section,id", "--no-cache"],
+        check=True, capture_output=True,
+    )
+    records = [json.loads(line) for line in out.read_text(encoding="utf-8").splitlines()]
+    assert records == [{"id": a["id"], "section": a["section"]} for a in tran.values()]
+    with pytest.raises(ValueError):
+        parse_amendments.parse_fields("id,text")
+
+
+# ── layout profiles ───────────────────────────────────────────────────────────
+
+def test_layout_clip_matches_span_filter():
+    config = parse_amendments.ParserConfig(layout=parse_amendments.LayoutProfile("half", footer_y=400))
+    clipped = parse_amendments.extract_spans(str(IMCO_PDF), config=config)
+    full = parse_amendments.extract_spans(str(IMCO_PDF))
+    assert clipped == [s for s in full if s.y <= 400]
+
+
+def test_layout_from_json(tmp_path):
+    path = tmp_path / "narrow.json"
+    path.write_text(json.dumps({"column_split": 200, "ambiguous_low": 180, "ambiguous_high": 230}))
+    layout = parse_amendments.load_layout(str(path))
+    assert layout.name == "narrow" and layout.column_split == 200
+    assert layout.footer_y == parse_amendments.DEFAULT_LAYOUT.footer_y
+    assert parse_amendments.load_layout("ep") is parse_amendments.DEFAULT_LAYOUT
+    with pytest.raises(ValueError):
+        parse_amendments.load_layout("nonexistent")
+
+
+# ── parser configuration ──────────────────────────────────────────────────────
+
+def test_configs_run_concurrently(imco):
+    # Moving the column split left of the left column puts all text on the right.
+    shifted = parse_amendments.ParserConfig(layout=parse_amendments.LayoutProfile("shifted", column_split=50))
+    jobs = [parse_amendments.DEFAULT_CONFIG, shifted] * 3
+    with ThreadPoolExecutor(max_workers=len(jobs)) as pool:
+        results = list(pool.map(lambda config: parse_amendments.parse_pdf(IMCO_PDF, config=config), jobs))
+
+    expected_shifted = parse_amendments.amendments_to_json(parse_amendments.parse_pdf(IMCO_PDF, config=shifted))
+    assert expected_shifted != list(imco.values())
+    for config, result in zip(jobs, results):
+        data = parse_amendments.amendments_to_json(result)
+        assert data == (list(imco.values()) if config is parse_amendments.DEFAULT_CONFIG else expected_shifted)
+
+
+# ── column calibration ────────────────────────────────────────────────────────
+
+def _without_positions(data: list) -> list:
+    # ambiguous_column_split warnings quote span x positions, which move with the page
+    return [{**a, "warnings": [w.split(" at x≈")[0] for w in a["warnings"]]} for a in data]
+
+
+def test_calibration_follows_shifted_margins(tmp_path, imco):
+    spans = parse_amendments.extract_spans(str(IMCO_PDF))
+    assert parse_amendments.calibrate(spans) is parse_amendments.DEFAULT_CONFIG
+
+    # whole document moved 30 pt right, plus one landscape-like page stretched further
+    moved = [replace(s, x=s.x + 30) for s in spans]
+    moved = [replace(s, x=s.x * 1.4 + 20) if s.page_num == 10 else s for s in moved]
+    cache = parse_amendments.LayoutCache(str(tmp_path / "layouts.json"))
+    config = parse_amendments.calibrate(moved, cache=cache)
+    assert config.layout.column_split == pytest.approx(parse_amendments.COLUMN_SPLIT_X + 30, abs=0.5)
+    assert [n for n, _ in config.page_layouts] == [10]
+    hash(config)
+    assert parse_amendments.calibrate(moved, cache=parse_amendments.LayoutCache(cache.path)) == config
+
+    lines = parse_amendments.assemble_lines(moved, config)
+    data = parse_amendments.amendments_to_json(parse_amendments.parse_amendments(lines, config=config))
+    assert _without_positions(data) == _without_positions(list(imco.values()))
+
+
+# ── page-range shards ─────────────────────────────────────────────────────────
+
+def test_page_shards_merge_to_serial_output(amendments):
+    pages = parse_amendments.pdf_page_count(str(JURI_PDF))
+    ranges = [(start, min(start + 6, pages)) for start in range(1, pages + 1, 7)]
+    shards = [parse_amendments.parse_page_shard(str(JURI_PDF), start, stop) for start, stop in ranges]
+    # an amendment spanning a shard edge is carried as an open tail and head
+    assert any(s.tail is not None for s in shards) and any(s.head for s in shards[1:])
+
+    shards = [parse_amendments.PageShard.from_json(json.loads(json.dumps(s.to_json()))) for s in shards]
+    merged = parse_amendments.merge_page_shards(reversed(shards))
+    assert parse_amendments.amendments_to_json(merged) == list(amendments.values())
+
+    with pytest.raises(ValueError):
+        parse_amendments.merge_page_shards(shards[:-1])
+
+
+def test_page_shard_merge_warns_across_a_gap_at_the_seam(tmp_path):
+    pdf, seam = _gap_pdf(tmp_path)
+    shards = [parse_amendments.parse_page_shard(pdf, 1, seam),
+              parse_amendments.parse_page_shard(pdf, seam + 1, parse_amendments.pdf_page_count(pdf))]
+    expected = parse_amendments.parse_pdf(pdf)
+    assert expected[5].warnings == ["non_sequential_id: expected 8, got 10"]
+    assert parse_amendments.merge_page_shards(shards) == expected
+    assert parse_amendments.merge_page_shards(shards) == expected  # the shards were left untouched
@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+Sweep parser parameters over a labelled corpus and report the Pareto set.
+
+Spans are extracted once per document (through the span cache), then every
+combination of the parameter grid is run through line assembly and the state
+machine on a process pool.  Each setting is scored by how many expected
+amendment ids it misses or invents and by its total warning count; the
+settings no other setting beats on both are reported:
+
+    python tune.py --grid column_split=230,244,260 line_y_tolerance=1,2,3
+    python tune.py --labels corpus.json -o sweep.json
+
+A labels file maps PDF paths to their expected ids, e.g.
+``{"corpus/a.pdf": "1-344", "corpus/b.pdf": "5-201"}``.
+"""
+
+import argparse
+import itertools
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import replace
+from pathlib import Path
+
+import parse_amendments as pa
+
+ROOT = Path(__file__).parent
+FIXTURE_LABELS = {
+    str(ROOT / "tests" / "JURI-AM-776972_EN.pdf"): "1-344",
+    str(ROOT / "tests" / "IMCO-AM-773238_EN.pdf"): "1-217",
+    str(ROOT / "tests" / "ENVI-AM-776927_EN.pdf"): "172-406",
+    str(ROOT / "tests" / "TRAN-AM-777048_EN.pdf"): "5-201",
+}
+# ParserConfig fields first, LayoutProfile fields after
+CONFIG_PARAMS = ("line_y_tolerance", "header_min_size")
+LAYOUT_PARAMS = ("column_split", "ambiguous_low", "ambiguous_high")
+DEFAULT_GRID = {
+    "line_y_tolerance": [1, 2, 3],
+    "column_split": [230, 244, 260],
+    "ambiguous_low": [200, 220],
+    "ambiguous_high": [280, 300],
+}
+
+# Per-worker state, filled in once by _init_worker.
+_DOCUMENTS = {}
+
+
+def parse_grid(items: list) -> dict:
+    """``["column_split=230,244", ...]`` → ``{"column_split": [230.0, 244.0], ...}``."""
+    grid = {}
+    for item in items:
+        name, sep, values = item.partition("=")
+        if not sep or name not in CONFIG_PARAMS + LAYOUT_PARAMS:
+            raise ValueError(f"bad grid entry {item!r}; use NAME=v1,v2 with NAME one of "
+                             f"{', '.join(CONFIG_PARAMS + LAYOUT_PARAMS)}")
+        grid[name] = [float(v) for v in values.split(",") if v]
+    return grid
+
+
+def grid_settings(grid: dict) -> list:
+    """Every combination of ``grid`` as a dict, skipping inverted ambiguous bands."""
+    names = sorted(grid)
+    settings = []
+    for values in itertools.product(*(grid[name] for name in names)):
+        setting = dict(zip(names, values))
+        low = setting.get("ambiguous_low", pa.DEFAULT_LAYOUT.ambiguous_low)
+        high = setting.get("ambiguous_high", pa.DEFAULT_LAYOUT.ambiguous_high)
+        if low < high:
+            settings.append(setting)
+    return settings
+
+
+def config_for(setting: dict, base: pa.ParserConfig = pa.DEFAULT_CONFIG) -> pa.ParserConfig:
+    layout = replace(base.layout, **{k: v for k, v in setting.items() if k in LAYOUT_PARAMS})
+    return replace(base, layout=layout, **{k: v for k, v in setting.items() if k in CONFIG_PARAMS})
+
+
+def _init_worker(documents: dict) -> None:
+    _DOCUMENTS.update(documents)
+
+
+def _evaluate_group(settings: list, documents: dict = None) -> list:
+    """Score settings that share a line tolerance, assembling each document's lines once.
+
+    ``documents`` defaults to the ones handed to this worker process.
+    """
+    if documents is None:
+        documents = _DOCUMENTS
+    lines = {}
+    results = []
+    for setting in settings:
+        config = config_for(setting)
+        missing = extra = warnings = 0
+        for name, (spans, expected) in documents.items():
+            if name not in lines:
+                lines[name] = pa.assemble_lines(spans, config)
+            amendments = pa.parse_amendments(lines[name], config=config)
+            found = {int(pa.AMENDMENT_RE.match(a.id).group(1)) for a in amendments}
+            missing += len(expected - found)
+            extra += len(found - expected)
+            warnings += sum(len(a.warnings) for a in amendments)
+        results.append({"setting": setting, "id_errors": missing + extra, "missing_ids": missing,
+                        "extra_ids": extra, "warnings": warnings})
+    return results
+
+
+def pareto_front(results: list) -> list:
+    """Results not dominated on (id_errors, warnings), best first."""
+    front = []
+    for r in results:
+        dominated = any(
+            o["id_errors"] <= r["id_errors"] and o["warnings"] <= r["warnings"]
+            and (o["id_errors"], o["warnings"]) != (r["id_errors"], r["warnings"])
+            for o in results
+        )
+        if not dominated:
+            front.append(r)
+    return sorted(front, key=lambda r: (r["id_errors"], r["warnings"]))
+
+
+def load_documents(labels: dict, cache: pa.SpanCache = None) -> dict:
+    """Extract (or load cached) spans once per labelled document."""
+    return {
+        path: (pa.load_spans(path, cache=cache), pa.parse_id_ranges(spec))
+        for path, spec in labels.items()
+    }
+
+
+def run_sweep(documents: dict, grid: dict, workers: int = 1) -> list:
+    settings = grid_settings(grid)
+    tolerance = pa.DEFAULT_CONFIG.line_y_tolerance
+    groups = {}
+    for setting in settings:
+        groups.setdefault(setting.get("line_y_tolerance", tolerance), []).append(setting)
+    # Split large groups so every worker gets a share, without re-assembling lines too often.
+    chunk = max(1, -(-len(settings) // (max(workers, 1) * 2)))
+    tasks = [group[i:i + chunk] for group in groups.values() for i in range(0, len(group), chunk)]
+
+    if workers <= 1:
+        return [r for task in tasks for r in _evaluate_group(task, documents)]
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(documents,)) as pool:
+        return [r for batch in pool.map(_evaluate_group, tasks) for r in batch]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sweep EP parser parameters over a labelled corpus")
+    parser.add_argument("--labels", help="JSON file mapping PDF paths to expected id ranges "
+                                         "(default: the bundled fixtures)")
+    parser.add_argument("--grid", nargs="+", metavar="NAME=V1,V2",
+                        help="Values to try per parameter (default: a small grid over "
+                             f"{', '.join(DEFAULT_GRID)})")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="Parallel processes (default: all cores)")
+    parser.add_argument("--no-cache", action="store_true", help="Do not read or write the span cache")
+    parser.add_argument("-o", "--output", default="sweep_results.json", help="Results JSON file")
+    args = parser.parse_args()
+
+    if args.labels:
+        with open(args.labels, encoding="utf-8") as f:
+            labels = json.load(f)
+    else:
+        labels = FIXTURE_LABELS
+    try:
+        grid = parse_grid(args.grid) if args.grid else DEFAULT_GRID
+    except ValueError as exc:
+        parser.error(str(exc))
+
+    cache = None if args.no_cache else pa.SpanCache(pa.default_cache_dir())
+    started = time.perf_counter()
+    documents = load_documents(labels, cache)
+    print(f"Loaded {len(documents)} documents in {time.perf_counter() - started:.1f}s", file=sys.stderr)
+
+    started = time.perf_counter()
+    results = run_sweep(documents, grid, workers=args.workers)
+    front = pareto_front(results)
+    print(f"Evaluated {len(results)} settings in {time.perf_counter() - started:.1f}s", file=sys.stderr)
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump({"labels": labels, "grid": grid, "results": results, "pareto": front}, f, indent=2)
+
+    print("\nPareto set (id errors, warnings):")
+    for r in front:
+        setting = ", ".join(f"{k}={v:g}" for k, v in sorted(r["setting"].items()))
+        print(f"  {r['id_errors']:4d} {r['warnings']:6d}  {setting}")
+    print(f"\nResults written to {args.output}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()